@@ -144,8 +144,11 @@ while running:
     # --- Clear the area for the thermal feed
     screen.fill((0, 0, 0)) # Clear the whole screen
 
-    temp_min_frame = np.min(frame)
-    temp_max_frame = np.max(frame)
+    # One contiguous float32 copy of the list for the reductions, instead of
+    # np.min/np.max each converting the list again
+    arr = np.ascontiguousarray(frame, dtype=np.float32)
+    temp_min_frame = arr.min()
+    temp_max_frame = arr.max()
 
     for y in range(SENSOR_HEIGHT):
         for x in range(SENSOR_WIDTH):
@@ -13,22 +13,23 @@ Features:
 import os
 import logging
 import threading
+import asyncio
+import concurrent.futures
 import time
 import datetime
 import io
-import collections
+import functools
 
 from dotenv import load_dotenv
 load_dotenv()
 
 import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output
-import plotly.graph_objs as go
+from dash import dcc, html, Patch
+from dash.dependencies import Input, Output, State
+import plotly.io as pio
+from plotly.colors import hex_to_rgb, make_colorscale, sequential
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+from PIL import Image
 
 # Optional sensor libs
 try:
@@ -46,7 +47,32 @@ try:
 except Exception:
     adafruit_mlx90640 = None
 
+# Optional fast JSON encoder for callback responses
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+# Optional JIT for the per-frame stats kernel
+try:
+    from numba import njit
+except Exception:
+    njit = None
+
+# Optional production WSGI server + response compression
+try:
+    from waitress import serve
+except Exception:
+    serve = None
+
+try:
+    from flask_compress import Compress
+except Exception:
+    Compress = None
+
 import smtplib
+from email import policy
+from email.generator import BytesGenerator
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.image import MIMEImage
@@ -57,9 +83,12 @@ from email.mime.image import MIMEImage
 GMAIL_EMAIL = os.getenv("EMAIL_SENDER")
 GMAIL_APP_PASSWORD = os.getenv("EMAIL_APP_PASSWORD")
 SMTP_SERVER = "smtp.gmail.com"
-SMTP_PORT = 587
+SMTP_PORT = 465        # implicit TLS (SMTP_SSL), no STARTTLS round-trip
+SMTP_KEEPALIVE = 60    # seconds idle before a reused connection is probed with NOOP
 ALERT_COOLDOWN = int(os.getenv("ALERT_COOLDOWN", "300"))
+ALERT_COOLDOWN_NS = ALERT_COOLDOWN * 10**9
 DASH_REFRESH_INTERVAL = int(os.getenv("DASH_REFRESH_INTERVAL_MS", "1500"))
+DASH_THREADS = int(os.getenv("DASH_THREADS", "4"))
 
 # --- DEFAULT THRESHOLDS (Change these numbers to adjust defaults) ---
 DEFAULT_DHT_TEMP_THRESHOLD = 30   # Max ambient temp in °C
@@ -68,6 +97,7 @@ DEFAULT_THERMAL_TEMP_THRESHOLD = 40 # Max surface temp in °C
 
 MLX_WIDTH = 32
 MLX_HEIGHT = 24
+MLX_NOISE_CEILING = 150  # °C; frames with any pixel above this are read glitches
 MAX_HISTORY = 200
 DHT_POLL_INTERVAL = float(os.getenv("DHT_POLL_INTERVAL", "2.0"))
 
@@ -97,6 +127,8 @@ logging.basicConfig(level=logging.DEBUG,
                     format="%(asctime)s [%(levelname)s] %(message)s",
                     handlers=[logging.StreamHandler(),
                               logging.FileHandler(LOGFILE)])
+# numba logs every JIT compile pass at DEBUG
+logging.getLogger("numba").setLevel(logging.WARNING)
 logger = logging.getLogger("sensor_dashboard")
 
 # ---------------------------
@@ -104,22 +136,40 @@ logger = logging.getLogger("sensor_dashboard")
 # ---------------------------
 data_lock = threading.Lock()
 latest_data = {
+    # Per-sensor readings, NaN when a sensor has no data
     "dht": {
-        "t1": None, "h1": None,
-        "t2": None, "h2": None,
-        "t3": None, "h3": None,
-        "t4": None, "h4": None
+        "t": np.full(4, np.nan, dtype=np.float32),
+        "h": np.full(4, np.nan, dtype=np.float32)
     },
-    "mlx_frame": np.zeros((MLX_HEIGHT, MLX_WIDTH)),
+    # Single-producer/single-consumer ring buffers, written without the lock.
+    # mlx_head counts every sample ever written and is bumped only after the
+    # slot is filled, so readers never see a half-initialised slot.
     "mlx_stats": {
-        "time": collections.deque(maxlen=MAX_HISTORY),
-        "min": collections.deque(maxlen=MAX_HISTORY),
-        "max": collections.deque(maxlen=MAX_HISTORY),
-        "avg": collections.deque(maxlen=MAX_HISTORY),
-    }
+        "time": np.empty(MAX_HISTORY, dtype='datetime64[s]'),
+        "min": np.empty(MAX_HISTORY, dtype=np.float32),
+        "max": np.empty(MAX_HISTORY, dtype=np.float32),
+        "avg": np.empty(MAX_HISTORY, dtype=np.float32),
+    },
+    "mlx_head": 0
 }
-last_dht_read_time = 0
-last_alert_time = 0
+# Thermal double buffer: the sensor thread fills the back buffer outside the
+# lock and only flips current_idx under it. Readers treat
+# frame_buffers[current_idx] as immutable until the next flip.
+frame_buffers = [np.zeros((MLX_HEIGHT, MLX_WIDTH), dtype=np.float32),
+                 np.zeros((MLX_HEIGHT, MLX_WIDTH), dtype=np.float32)]
+current_idx = 0
+last_alert_ns = -ALERT_COOLDOWN_NS  # monotonic; first alert is never in cooldown
+
+def ring_snapshot(buf, head):
+    """Return the ring buffer contents oldest-first (one memcpy).
+
+    Lock-free: if the writer laps the oldest slot mid-copy, at most that one
+    sample is newer than expected, which is harmless for a trend graph.
+    """
+    if head < MAX_HISTORY:
+        return buf[:head].copy()
+    i = head % MAX_HISTORY
+    return np.concatenate((buf[i:], buf[:i]))
 
 # ---------------------------
 # Sensor init
@@ -158,78 +208,204 @@ def setup_sensors():
 # ---------------------------
 # Background sensor reading
 # ---------------------------
-def sensor_reading_thread(dht_sensors, mlx):
-    global last_dht_read_time
-    raw_frame = [0.0] * (MLX_WIDTH * MLX_HEIGHT)
-    
+if njit:
+    @njit(fastmath=True, cache=True)
+    def fused_stats(a):
+        """(min, max, mean, is_noise) of a flat frame in a single pass."""
+        mn = a[0]; mx = a[0]; total = 0.0
+        for v in a:
+            if v < mn: mn = v
+            if v > mx: mx = v
+            total += v
+        return mn, mx, total / a.size, mx > MLX_NOISE_CEILING
+else:
+    def fused_stats(a):
+        # any() short-circuits, so glitched frames skip the reductions
+        if (a > MLX_NOISE_CEILING).any():
+            return 0.0, 0.0, 0.0, True
+        return a.min(), a.max(), a.mean(), False
+
+def read_dht(sensor):
+    try:
+        if sensor:
+            return sensor.temperature, sensor.humidity
+    except Exception as e:
+        logger.debug(f"DHT read error: {e}")
+    return None, None
+
+async def poll_dht(loop, pool, dht_sensors):
     while True:
-        current_time = time.monotonic()
-
-        # --- READ DHTs ---
-        if (current_time - last_dht_read_time) > DHT_POLL_INTERVAL:
-            def read_dht(sensor):
-                try:
-                    if sensor:
-                        return sensor.temperature, sensor.humidity
-                except Exception as e:
-                    logger.debug(f"DHT read error: {e}")
-                return None, None
-            
-            results = []
-            for s in dht_sensors:
-                results.append(read_dht(s))
-            
-            with data_lock:
-                latest_data["dht"]["t1"], latest_data["dht"]["h1"] = results[0]
-                latest_data["dht"]["t2"], latest_data["dht"]["h2"] = results[1]
-                latest_data["dht"]["t3"], latest_data["dht"]["h3"] = results[2]
-                latest_data["dht"]["t4"], latest_data["dht"]["h4"] = results[3]
+        # All four (bit-banged, blocking) reads run side by side in the pool
+        results = await asyncio.gather(*(loop.run_in_executor(pool, read_dht, s) for s in dht_sensors))
 
-            last_dht_read_time = current_time
+        with data_lock:
+            for i, (t, h) in enumerate(results):
+                latest_data["dht"]["t"][i] = np.nan if t is None else t
+                latest_data["dht"]["h"][i] = np.nan if h is None else h
+
+        await asyncio.sleep(DHT_POLL_INTERVAL)
+
+async def poll_mlx(loop, pool, mlx):
+    global current_idx
+    # getFrame writes element-wise, so it can fill the flat views directly
+    raw_frames = [buf.reshape(-1) for buf in frame_buffers]
+
+    while True:
+        try:
+            back = 1 - current_idx
+            await loop.run_in_executor(pool, mlx.getFrame, raw_frames[back])
+            fmin, fmax, fmean, is_noise = fused_stats(raw_frames[back])
+
+            # Filter ghost noise
+            if is_noise:
+                await asyncio.sleep(0.1)
+                continue
+
+            now = np.datetime64(datetime.datetime.now(), 's')
+
+            head = latest_data["mlx_head"]
+            slot = head % MAX_HISTORY
+            stats = latest_data["mlx_stats"]
+            stats["time"][slot] = now
+            stats["min"][slot] = fmin
+            stats["max"][slot] = fmax
+            stats["avg"][slot] = fmean
+
+            with data_lock:
+                current_idx ^= 1
+            latest_data["mlx_head"] = head + 1
+        except Exception as e:
+            logger.debug(f"MLX read error: {e}")
+            await asyncio.sleep(0.2)
 
-        # --- READ THERMAL CAMERA ---
+async def read_sensors(dht_sensors, mlx):
+    loop = asyncio.get_running_loop()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(dht_sensors) + 1) as pool:
+        tasks = [poll_dht(loop, pool, dht_sensors)]
         if mlx:
-            try:
-                mlx.getFrame(raw_frame)
-                frame_arr = np.array(raw_frame).reshape((MLX_HEIGHT, MLX_WIDTH))
-                
-                # Filter ghost noise
-                if np.max(frame_arr) > 150:
-                    time.sleep(0.1)
-                    continue
-
-                with data_lock:
-                    latest_data["mlx_frame"] = frame_arr.copy()
-                    time_str = datetime.datetime.now().strftime("%H:%M:%S")
-                    latest_data["mlx_stats"]["time"].append(time_str)
-                    latest_data["mlx_stats"]["min"].append(float(np.min(frame_arr)))
-                    latest_data["mlx_stats"]["max"].append(float(np.max(frame_arr)))
-                    latest_data["mlx_stats"]["avg"].append(float(np.mean(frame_arr)))
-            except Exception as e:
-                logger.debug(f"MLX read error: {e}")
-                time.sleep(0.2)
-        else:
-            time.sleep(DASH_REFRESH_INTERVAL / 1000.0)
+            tasks.append(poll_mlx(loop, pool, mlx))
+        await asyncio.gather(*tasks)
+
+def sensor_reading_thread(dht_sensors, mlx):
+    """Runs the sensor event loop; blocking driver calls go to a thread pool."""
+    asyncio.run(read_sensors(dht_sensors, mlx))
 
 # ---------------------------
 # Email helpers
 # ---------------------------
+# 256-entry inferno colormap interpolated from Plotly's 'Inferno' stops, so
+# email snapshots match the dashboard heatmap without importing matplotlib
+_INFERNO_STOPS = np.array([hex_to_rgb(c) for c in sequential.Inferno], dtype=np.float32)
+_stop_pos = np.linspace(0, 1, len(_INFERNO_STOPS))
+INFERNO_LUT = np.stack([np.interp(np.linspace(0, 1, 256), _stop_pos, _INFERNO_STOPS[:, c]) for c in range(3)],
+                       axis=-1).round().astype(np.uint8)
+SNAPSHOT_SCALE = 10  # 32x24 -> 320x240 so the email image is readable
+
 def generate_thermal_image_bytes(frame):
     buf = io.BytesIO()
     try:
-        plt.figure(figsize=(5,4))
-        plt.imshow(frame, cmap='inferno')
-        plt.colorbar(label='Temp (°C)')
-        plt.title('Snapshot at Alert Time')
-        plt.axis('off')
-        plt.savefig(buf, format='png', bbox_inches='tight')
-        plt.close()
-        buf.seek(0)
-        return buf.read()
+        frame = np.asarray(frame, dtype=np.float32)
+        f_min = frame.min()
+        span = max(float(frame.max() - f_min), 1e-6)
+        norm = np.clip((frame - f_min) / span * 255, 0, 255).astype(np.uint8)
+        norm = np.repeat(np.repeat(norm, SNAPSHOT_SCALE, axis=0), SNAPSHOT_SCALE, axis=1)
+        Image.fromarray(INFERNO_LUT[norm], 'RGB').save(buf, format='PNG', optimize=False)
+        return buf.getvalue()
     except Exception as e:
         logger.exception(f"Image generation failed: {e}")
         return None
 
+# Shared SMTP session: TLS handshake + AUTH are paid once, not per alert
+smtp_lock = threading.Lock()
+smtp_conn = None
+smtp_last_used = 0.0
+
+def drop_smtp_connection():
+    """Close and forget the shared session. Caller must hold smtp_lock."""
+    global smtp_conn
+    if smtp_conn is not None:
+        try:
+            smtp_conn.close()
+        except Exception:
+            pass
+        smtp_conn = None
+
+def get_smtp_connection():
+    """Return the logged-in shared connection, reconnecting if it went stale.
+    Caller must hold smtp_lock."""
+    global smtp_conn
+    if smtp_conn is not None and (time.monotonic() - smtp_last_used) > SMTP_KEEPALIVE:
+        try:
+            alive = smtp_conn.noop()[0] == 250  # e.g. 421 on idle timeout
+        except (smtplib.SMTPException, OSError):
+            alive = False
+        if not alive:
+            drop_smtp_connection()
+    if smtp_conn is None:
+        # Only cache the session once it is authenticated
+        conn = smtplib.SMTP_SSL(SMTP_SERVER, SMTP_PORT, timeout=15)
+        try:
+            conn.login(GMAIL_EMAIL, GMAIL_APP_PASSWORD)
+        except Exception:
+            conn.close()
+            raise
+        smtp_conn = conn
+    return smtp_conn
+
+class SMTPDataStream:
+    """Write-only sink that dot-stuffs generator output onto the DATA socket."""
+    def __init__(self, sock):
+        self.sock = sock
+        self.at_line_start = True
+
+    def write(self, data):
+        if self.at_line_start and data.startswith(b'.'):
+            data = b'.' + data
+        data = data.replace(b'\n.', b'\n..')
+        self.sock.sendall(data)
+        self.at_line_start = data.endswith(b'\n')
+        return len(data)
+
+def stream_message(conn, msg):
+    """Like send_message(), but the MIME tree is flattened straight to the
+    socket instead of being rendered into one in-memory bytes blob first."""
+    code, resp = conn.mail(msg['From'])
+    if code != 250:
+        raise smtplib.SMTPSenderRefused(code, resp, msg['From'])
+    code, resp = conn.rcpt(msg['To'])
+    if code not in (250, 251):
+        raise smtplib.SMTPRecipientsRefused({msg['To']: (code, resp)})
+    conn.putcmd("data")
+    code, resp = conn.getreply()
+    if code != 354:
+        raise smtplib.SMTPDataError(code, resp)
+
+    stream = SMTPDataStream(conn.sock)
+    BytesGenerator(stream, policy=policy.SMTP).flatten(msg)
+    conn.sock.sendall((b'' if stream.at_line_start else b'\r\n') + b'.\r\n')
+    code, resp = conn.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, resp)
+
+def smtp_send(msg):
+    global smtp_last_used
+    with smtp_lock:
+        try:
+            stream_message(get_smtp_connection(), msg)
+        except smtplib.SMTPServerDisconnected:
+            # Server dropped us between probes; retry once on a fresh session
+            drop_smtp_connection()
+            try:
+                stream_message(get_smtp_connection(), msg)
+            except Exception:
+                drop_smtp_connection()
+                raise
+        except Exception:
+            # A failure mid-DATA leaves the session in an unknown state
+            drop_smtp_connection()
+            raise
+        smtp_last_used = time.monotonic()
+
 def send_alert_email_thread(target_email, subject, body, frame):
     def runner():
         if not GMAIL_EMAIL or not GMAIL_APP_PASSWORD:
@@ -245,11 +421,7 @@ def send_alert_email_thread(target_email, subject, body, frame):
             if img_data:
                 msg.attach(MIMEImage(img_data, name='thermal_snapshot.png'))
 
-            server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=15)
-            server.starttls()
-            server.login(GMAIL_EMAIL, GMAIL_APP_PASSWORD)
-            server.send_message(msg)
-            server.quit()
+            smtp_send(msg)
             logger.info(f"Email sent to {target_email}")
         except Exception as e:
             logger.error(f"Email failed: {e}")
@@ -257,15 +429,71 @@ def send_alert_email_thread(target_email, subject, body, frame):
     t = threading.Thread(target=runner, daemon=True)
     t.start()
 
+# ---------------------------
+# Figure skeletons
+# ---------------------------
+# Built once and shipped with the layout; the interval callback only
+# patches the fields that change (z, y arrays, titles). Plain figure dicts
+# skip plotly.graph_objs validation entirely.
+DHT_LABELS = ['S1', 'S2', 'S3', 'S4']
+
+# The heatmap carries uint8 z (frame quantised to its own min..max); the
+# colorbar ticks map back to °C. Hover reads the rounded °C labels from
+# customdata; 'Show Values' draws the same labels as text.
+HEATMAP_TICKS = np.linspace(0, 255, 5).round()
+HEATMAP_FIG = {
+    # plotly.js has no built-in 'Inferno', so expand Plotly's stops here
+    "data": [{"type": "heatmap", "z": np.zeros((MLX_HEIGHT, MLX_WIDTH), dtype=np.uint8), "zmin": 0, "zmax": 255,
+              "colorscale": make_colorscale(sequential.Inferno), "colorbar": {"tickvals": HEATMAP_TICKS},
+              "texttemplate": "%{text}", "textfont": {"size": 10},
+              "hovertemplate": "x: %{x}, y: %{y}<br>%{customdata}°C<extra></extra>"}],
+    "layout": {"title": {"text": "Max: --"}, "yaxis": {"autorange": "reversed", "scaleanchor": "x"}}
+}
+
+HISTORY_FIG = {
+    "data": [{"type": "scatter", "x": [], "y": [], "name": "Max"},
+             {"type": "scatter", "x": [], "y": [], "name": "Avg"}],
+    "layout": {"title": {"text": "Thermal Trends"}}
+}
+
+DHT_FIG = {
+    "data": [{"type": "bar", "name": "Temp (°C)", "x": DHT_LABELS, "y": [0]*4},
+             {"type": "bar", "name": "Humidity (%)", "x": DHT_LABELS, "y": [0]*4}],
+    "layout": {"title": {"text": "Sensor Readings"}}
+}
+
+@functools.lru_cache(maxsize=1)
+def heatmap_text(frame_bytes):
+    """Rounded per-pixel labels, recomputed only when the frame changes."""
+    return np.frombuffer(frame_bytes, dtype=np.float32).reshape((MLX_HEIGHT, MLX_WIDTH)).round(0).astype(np.int16)
+
 # ---------------------------
 # Dash app
 # ---------------------------
+# Dash encodes callback output through plotly.io.json; with orjson the
+# float32 frame is written straight from its buffer (OPT_SERIALIZE_NUMPY)
+# instead of being walked element by element by the stdlib encoder.
+if orjson:
+    pio.json.config.default_engine = 'orjson'
+
+# Warm-start the encoder: serialising the skeletons once at import pays for
+# the engine import and plotly's first-use setup here, not on the first tick
+for _fig in (HEATMAP_FIG, HISTORY_FIG, DHT_FIG):
+    pio.json.to_json_plotly(_fig)
+
 app = dash.Dash(__name__)
 app.title = "Server Room Monitor"
 
+# gzip the callback JSON (heatmap/history payloads compress well)
+if Compress:
+    app.server.config['COMPRESS_MIMETYPES'] = ['application/json']
+    Compress(app.server)
+
 app.layout = html.Div(style={'fontFamily':'Arial','maxWidth':'1200px','margin':'0 auto'}, children=[
     html.H1("Server Room Monitor (4x Sensor Array)", style={'textAlign':'center'}),
     dcc.Interval(id='interval-component', interval=DASH_REFRESH_INTERVAL, n_intervals=0),
+    # Per-client key of what each output last received, see update_dashboard()
+    dcc.Store(id='last-emitted'),
     
     html.Div(style={'backgroundColor':'#f0f0f0','padding':'15px','borderRadius':'10px','marginBottom':'20px'}, children=[
         html.H3("⚙️ Alert Configuration"),
@@ -305,11 +533,11 @@ app.layout = html.Div(style={'fontFamily':'Arial','maxWidth':'1200px','margin':'
         html.Div(style={'flex':'50%','padding':10}, children=[
             html.H3("Live Thermal Feed"), 
             dcc.Checklist(id='view-options', options=[{'label':' Show Values','value':'text'},{'label':' Force Square Pixels','value':'square'}], value=['square'], inline=True), 
-            dcc.Graph(id='thermal-heatmap', style={'height':'600px'})
+            dcc.Graph(id='thermal-heatmap', figure=HEATMAP_FIG, style={'height':'600px'})
         ]),
         html.Div(style={'flex':'50%','padding':10}, children=[
             html.H3("Thermal History"), 
-            dcc.Graph(id='mlx-history-graph', style={'height':'400px'})
+            dcc.Graph(id='mlx-history-graph', figure=HISTORY_FIG, style={'height':'400px'})
         ]),
         html.Div(style={'flex':'50%','padding':10}, children=[
             html.H3("DHT Status (4 Sensors)"), 
@@ -317,7 +545,7 @@ app.layout = html.Div(style={'fontFamily':'Arial','maxWidth':'1200px','margin':'
         ]),
         html.Div(style={'flex':'50%','padding':10}, children=[
             html.H3("Environment"), 
-            dcc.Graph(id='dht-bar-chart', style={'height':'400px'})
+            dcc.Graph(id='dht-bar-chart', figure=DHT_FIG, style={'height':'400px'})
         ]),
     ])
 ])
@@ -332,7 +560,8 @@ def toggle_inputs(selection):
 
 @app.callback([Output('dht-status-display','children'),
                Output('thermal-heatmap','figure'), Output('mlx-history-graph','figure'),
-               Output('dht-bar-chart','figure'), Output('alert-status-div','children')],
+               Output('dht-bar-chart','figure'), Output('alert-status-div','children'),
+               Output('last-emitted','data')],
               [Input('interval-component','n_intervals'),
                Input('alert-source-selector','value'),
                Input('view-options','value'),
@@ -340,13 +569,22 @@ def toggle_inputs(selection):
                Input('input-dht-hum','value'),
                Input('input-thermal-temp','value'),
                Input('thermal-mode-select','value'),
-               Input('input-email-addr','value')])
-def update_dashboard(n, alert_source, view_opts, dht_temp_lim, dht_hum_lim, thermal_lim, thermal_mode, email_addr):
-    global last_alert_time
+               Input('input-email-addr','value')],
+              [State('last-emitted','data')])
+def update_dashboard(n, alert_source, view_opts, dht_temp_lim, dht_hum_lim, thermal_lim, thermal_mode, email_addr, last_emitted):
+    global last_alert_ns
     with data_lock:
-        dht = latest_data["dht"].copy()
-        frame = latest_data["mlx_frame"].copy()
-        stats = {k: list(v) for k,v in latest_data["mlx_stats"].items()}
+        dht_t = latest_data["dht"]["t"].copy()
+        dht_h = latest_data["dht"]["h"].copy()
+        idx = current_idx
+    head = latest_data["mlx_head"]
+    frame = frame_buffers[idx]
+    # Key of what each of this client's outputs last received; unchanged
+    # outputs get no_update. The store starts empty on every page load, when
+    # only the layout skeletons are showing. mlx_head doubles as the thermal
+    # frame/stats version.
+    last_emitted = dict(last_emitted or dict.fromkeys(("dht", "heatmap", "history", "alert")))
+    before = dict(last_emitted)
 
     alert_msg = ""
     triggers = []
@@ -355,23 +593,21 @@ def update_dashboard(n, alert_source, view_opts, dht_temp_lim, dht_hum_lim, ther
     has_temp_alert = False
     has_hum_alert = False
 
-    current_time = time.time()
+    now_ns = time.monotonic_ns()
 
     valid_email = email_addr and "@" in email_addr and "." in email_addr
     if valid_email:
         # 1. Check DHT Alerts (If Selected)
         if alert_source == 'dht' and dht_temp_lim is not None and dht_hum_lim is not None:
-            for i in range(1, 5):
-                t_val = dht[f't{i}']
-                h_val = dht[f'h{i}']
-                # Temp Check
-                if t_val is not None and t_val > dht_temp_lim: 
-                    triggers.append(f"S{i} High Temp: {t_val:.1f}C")
-                    has_temp_alert = True
-                # Humidity Check
-                if h_val is not None and h_val > dht_hum_lim: 
-                    triggers.append(f"S{i} High Humidity: {h_val:.1f}%")
-                    has_hum_alert = True
+            # NaN (no data) never compares greater, so missing sensors are skipped
+            t_mask = dht_t > dht_temp_lim
+            h_mask = dht_h > dht_hum_lim
+            has_temp_alert = bool(t_mask.any())
+            has_hum_alert = bool(h_mask.any())
+            # Strings are only built for breaching sensors (usually none)
+            for i in np.flatnonzero(t_mask | h_mask):
+                if t_mask[i]: triggers.append(f"S{i+1} High Temp: {dht_t[i]:.1f}C")
+                if h_mask[i]: triggers.append(f"S{i+1} High Humidity: {dht_h[i]:.1f}%")
         
         # 2. Check Thermal Alerts (If Selected)
         if alert_source == 'thermal' and thermal_lim is not None:
@@ -383,7 +619,7 @@ def update_dashboard(n, alert_source, view_opts, dht_temp_lim, dht_hum_lim, ther
         # 3. Send Email if any triggers exist
         if triggers:
             alert_msg = f"⚠️ Alert: {', '.join(triggers)}"
-            if (current_time - last_alert_time) > ALERT_COOLDOWN:
+            if (now_ns - last_alert_ns) > ALERT_COOLDOWN_NS:
                 # Dynamic Subject Line
                 if has_temp_alert and has_hum_alert:
                     subject = f"CRITICAL: Temp & Humidity Alert ({len(triggers)} Issues)"
@@ -393,54 +629,73 @@ def update_dashboard(n, alert_source, view_opts, dht_temp_lim, dht_hum_lim, ther
                     subject = f"WARNING: High Temperature Detected ({len(triggers)} Issues)"
 
                 body = "The following limits were breached:\n\n" + "\n".join(triggers)
-                send_alert_email_thread(email_addr, subject, body, frame)
-                last_alert_time = current_time
+                # The email thread outlives this tick, so give it its own copy
+                send_alert_email_thread(email_addr, subject, body, frame.copy())
+                last_alert_ns = now_ns
                 alert_msg += " (Email Sent)"
             else:
-                alert_msg += f" (Cooldown: {int(ALERT_COOLDOWN - (current_time - last_alert_time))}s)"
+                alert_msg += f" (Cooldown: {(ALERT_COOLDOWN_NS - (now_ns - last_alert_ns)) // 10**9}s)"
     elif email_addr:
         alert_msg = "⚠️ Invalid Email Address format"
 
     # Heatmap Logic
-    try:
-        t_min = float(np.min(frame)); t_max = float(np.max(frame))
-    except Exception:
-        frame = np.zeros((MLX_HEIGHT, MLX_WIDTH)); t_min, t_max = 0.0, 1.0
-    if t_min == t_max: t_max = t_min + 1.0
-    text_data = frame.round(0).astype(int) if 'text' in view_opts else None
-
-    heatmap_fig = go.Figure(data=[go.Heatmap(z=frame, zmin=t_min, zmax=t_max, colorscale='Inferno',
-                                            text=text_data, texttemplate="%{text}", textfont={"size":10})])
-    layout_args = dict(title=f'Max: {t_max:.1f}°C', yaxis=dict(autorange='reversed'))
-    if 'square' in view_opts: layout_args['yaxis']['scaleanchor'] = 'x'
-    heatmap_fig.update_layout(**layout_args)
+    heatmap_key = [head, list(view_opts or ())]  # JSON-friendly for the store
+    if heatmap_key != last_emitted["heatmap"]:
+        try:
+            t_min = float(np.min(frame)); t_max = float(np.max(frame))
+        except Exception:
+            frame = np.zeros((MLX_HEIGHT, MLX_WIDTH), dtype=np.float32); t_min, t_max = 0.0, 1.0
+        if t_min == t_max: t_max = t_min + 1.0
+        labels = heatmap_text(frame.tobytes())
+
+        # Display-only quantisation; alert checks above use the float32 frame
+        quant = ((frame - t_min) * (255.0 / (t_max - t_min))).astype(np.uint8)
+
+        heatmap_fig = Patch()
+        heatmap_fig['data'][0]['z'] = quant
+        heatmap_fig['data'][0]['colorbar']['ticktext'] = [f"{v:.1f}" for v in np.linspace(t_min, t_max, len(HEATMAP_TICKS))]
+        heatmap_fig['data'][0]['customdata'] = labels
+        heatmap_fig['data'][0]['text'] = labels if 'text' in view_opts else None
+        heatmap_fig['layout']['title']['text'] = f'Max: {t_max:.1f}°C'
+        if 'square' in view_opts: heatmap_fig['layout']['yaxis']['scaleanchor'] = 'x'
+        else: del heatmap_fig['layout']['yaxis']['scaleanchor']
+        last_emitted["heatmap"] = heatmap_key
+    else:
+        heatmap_fig = dash.no_update
 
     # History Graph
-    history_fig = go.Figure()
-    history_fig.add_trace(go.Scatter(x=stats.get('time',[]), y=stats.get('max',[]), name='Max'))
-    history_fig.add_trace(go.Scatter(x=stats.get('time',[]), y=stats.get('avg',[]), name='Avg'))
-    history_fig.update_layout(title='Thermal Trends')
-
-    # DHT Bar Chart
-    temps = [dht[f't{i}'] or 0 for i in range(1,5)]
-    hums = [dht[f'h{i}'] or 0 for i in range(1,5)]
-    names = ['S1', 'S2', 'S3', 'S4']
-    
-    dht_fig = go.Figure(data=[
-        go.Bar(name='Temp (°C)', x=names, y=temps),
-        go.Bar(name='Humidity (%)', x=names, y=hums)
-    ])
-    dht_fig.update_layout(title="Sensor Readings")
-
-    # Text Status
-    status_lines = []
-    for i in range(1, 5):
-        t = dht[f't{i}']
-        h = dht[f'h{i}']
-        s_text = f"Sensor {i}: {t:.1f}°C / {h:.1f}%" if t is not None else f"Sensor {i}: No Data"
-        status_lines.append(html.Div(s_text))
-    
-    return status_lines, heatmap_fig, history_fig, dht_fig, alert_msg
+    if head != last_emitted["history"]:
+        # Append-only ring: slots below head are complete, so no lock needed
+        stats = {k: ring_snapshot(v, head) for k,v in latest_data["mlx_stats"].items()}
+        history_fig = Patch()
+        history_fig['data'][0]['x'] = stats['time']
+        history_fig['data'][0]['y'] = stats['max']
+        history_fig['data'][1]['x'] = stats['time']
+        history_fig['data'][1]['y'] = stats['avg']
+        last_emitted["history"] = head
+    else:
+        history_fig = dash.no_update
+
+    # DHT Bar Chart + Text Status
+    dht_key = (dht_t.tobytes() + dht_h.tobytes()).hex()
+    if dht_key != last_emitted["dht"]:
+        dht_fig = Patch()
+        dht_fig['data'][0]['y'] = np.nan_to_num(dht_t)
+        dht_fig['data'][1]['y'] = np.nan_to_num(dht_h)
+
+        status_lines = [html.Div(f"Sensor {i}: {t:.1f}°C / {h:.1f}%" if not np.isnan(t) else f"Sensor {i}: No Data")
+                        for i, (t, h) in enumerate(zip(dht_t, dht_h), start=1)]
+        last_emitted["dht"] = dht_key
+    else:
+        dht_fig = status_lines = dash.no_update
+
+    if alert_msg == last_emitted["alert"]:
+        alert_out = dash.no_update
+    else:
+        alert_out = last_emitted["alert"] = alert_msg
+
+    store_out = last_emitted if last_emitted != before else dash.no_update
+    return status_lines, heatmap_fig, history_fig, dht_fig, alert_out, store_out
 
 # ---------------------------
 # Entrypoint
@@ -453,4 +708,9 @@ if __name__ == "__main__":
     dht_sensors, mlx = setup_sensors()
     threading.Thread(target=sensor_reading_thread, args=(dht_sensors, mlx), daemon=True).start()
     
-    app.run(host='0.0.0.0', port=8050, debug=False, use_reloader=False)
+    if serve:
+        # Multi-threaded server so concurrent callbacks don't queue behind each other
+        serve(app.server, host='0.0.0.0', port=8050, threads=DASH_THREADS)
+    else:
+        logger.warning("waitress not installed; falling back to the Flask dev server.")
+        app.run(host='0.0.0.0', port=8050, debug=False, use_reloader=False)
@@ -17,19 +17,23 @@ import threading
 import time
 import datetime
 import io
-import collections
+import re
+import queue
+import concurrent.futures
+import functools
 
 from dotenv import load_dotenv
 load_dotenv()
 
 import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output
+from dash import dcc, html, ctx, Patch, no_update
+from dash.dependencies import Input, Output, State
 import plotly.graph_objs as go
+import plotly.io as pio
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.dates import AutoDateLocator
 
 # Optional sensor libs
 try:
@@ -47,6 +51,24 @@ try:
 except Exception:
     adafruit_mlx90640 = None
 
+# Optional fast JSON encoder for callback responses
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+# Optional JIT for the per-frame stats kernel
+try:
+    from numba import njit
+except Exception:
+    njit = None
+
+# Optional production WSGI server
+try:
+    from waitress import serve
+except Exception:
+    serve = None
+
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -58,9 +80,11 @@ from email.mime.image import MIMEImage
 GMAIL_EMAIL = os.getenv("EMAIL_SENDER")
 GMAIL_APP_PASSWORD = os.getenv("EMAIL_APP_PASSWORD")
 SMTP_SERVER = "smtp.gmail.com"
-SMTP_PORT = 587
+SMTP_PORT = 465  # implicit TLS: no STARTTLS round-trip
 ALERT_COOLDOWN = int(os.getenv("ALERT_COOLDOWN", "300"))
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 DASH_REFRESH_INTERVAL = int(os.getenv("DASH_REFRESH_INTERVAL_MS", "1500"))
+DASH_THREADS = int(os.getenv("DASH_THREADS", "4"))
 
 # --- DEFAULT THRESHOLDS ---
 DEFAULT_DHT_TEMP_THRESHOLD = 45     # Max exhaust temp in °C
@@ -71,6 +95,8 @@ DEFAULT_THERMAL_TEMP_THRESHOLD = 50 # Surface hotspot limit °C
 MLX_WIDTH = 32
 MLX_HEIGHT = 24
 MAX_HISTORY = 100 
+# Longer histories are LTTB-decimated to this many points per trace
+HISTORY_PLOT_POINTS = int(os.getenv("HISTORY_PLOT_POINTS", "200"))
 DHT_POLL_INTERVAL = float(os.getenv("DHT_POLL_INTERVAL", "2.0"))
 
 # --- SENSOR PIN CONFIGURATION ---
@@ -90,6 +116,7 @@ DHT_PIN_4 = None
 MLX_REFRESH_RATE = None
 if adafruit_mlx90640 and hasattr(adafruit_mlx90640, "RefreshRate"):
     MLX_REFRESH_RATE = adafruit_mlx90640.RefreshRate.REFRESH_4_HZ
+MLX_FRAME_PERIOD = 0.25  # seconds per frame at REFRESH_4_HZ
 
 # ---------------------------
 # Logging
@@ -99,6 +126,8 @@ logging.basicConfig(level=logging.DEBUG,
                     format="%(asctime)s [%(levelname)s] %(message)s",
                     handlers=[logging.StreamHandler(),
                               logging.FileHandler(LOGFILE)])
+# numba logs every JIT compile pass at DEBUG
+logging.getLogger("numba").setLevel(logging.WARNING)
 logger = logging.getLogger("sensor_dashboard")
 
 # ---------------------------
@@ -106,19 +135,29 @@ logger = logging.getLogger("sensor_dashboard")
 # ---------------------------
 data_lock = threading.Lock()
 
+# Histories are fixed-size numpy ring buffers. The matching *_count is the
+# number of samples ever written, so the next slot is count % MAX_HISTORY.
+def create_ring(*keys):
+    ring = {"time": np.zeros(MAX_HISTORY, dtype='datetime64[s]')}
+    ring.update((k, np.full(MAX_HISTORY, np.nan, dtype=np.float32)) for k in keys)
+    return ring
+
 def create_history():
-    return {
-        "time": collections.deque(maxlen=MAX_HISTORY),
-        "temp": collections.deque(maxlen=MAX_HISTORY),
-        "hum": collections.deque(maxlen=MAX_HISTORY)
-    }
+    return create_ring("temp", "hum")
 
+def ring_snapshot(ring, count, keys=None):
+    """Oldest-first copies of the filled part of a ring (call under data_lock)."""
+    shift, n = -(count % MAX_HISTORY), min(count, MAX_HISTORY)
+    return {k: np.roll(ring[k], shift)[MAX_HISTORY - n:] for k in (keys or ring)}
+
+# "dht" and "mlx" are immutable snapshots: writers build a new object
+# and publish it with one assignment, so readers take them without data_lock.
+# The lock only guards the history rings and their counts.
 latest_data = {
+    # Latest reading per sensor (index 0-3); NaN = no reading
     "dht": {
-        "t1": None, "h1": None,
-        "t2": None, "h2": None,
-        "t3": None, "h3": None,
-        "t4": None, "h4": None
+        "t": np.full(4, np.nan, dtype=np.float32),
+        "h": np.full(4, np.nan, dtype=np.float32)
     },
     "dht_history": {
         1: create_history(),
@@ -126,16 +165,24 @@ latest_data = {
         3: create_history(),
         4: create_history()
     },
-    "mlx_frame": np.zeros((MLX_HEIGHT, MLX_WIDTH)),
-    "mlx_stats": {
-        "time": collections.deque(maxlen=MAX_HISTORY),
-        "min": collections.deque(maxlen=MAX_HISTORY),
-        "max": collections.deque(maxlen=MAX_HISTORY),
-        "avg": collections.deque(maxlen=MAX_HISTORY),
-    }
+    # Frame plus its stats, reduced once by the reader thread
+    "mlx": {"frame": np.zeros((MLX_HEIGHT, MLX_WIDTH), dtype=np.float32),
+            "min": 0.0, "max": 0.0, "avg": 0.0},
+    "mlx_stats": create_ring("min", "max", "avg"),
+    # Samples ever written per history; ring heads and client cursors
+    "dht_count": {1: 0, 2: 0, 3: 0, 4: 0},
+    "mlx_count": 0
 }
-last_dht_read_time = 0
 last_alert_time = 0
+stamp_cache = (None, None)  # (epoch second, its local datetime64)
+
+def now_stamp():
+    """Local wall-clock time as datetime64[s], built at most once per second."""
+    global stamp_cache
+    sec = int(time.time())
+    if stamp_cache[0] != sec:
+        stamp_cache = (sec, np.datetime64(datetime.datetime.fromtimestamp(sec), 's'))
+    return stamp_cache[1]
 
 # ---------------------------
 # Sensor init
@@ -174,80 +221,142 @@ def setup_sensors():
 # ---------------------------
 # Background sensor reading
 # ---------------------------
-def sensor_reading_thread(dht_sensors, mlx):
-    global last_dht_read_time
-    raw_frame = [0.0] * (MLX_WIDTH * MLX_HEIGHT)
-    
+# DHT and MLX are read on separate threads, each paced to its own rate by a
+# monotonic deadline, so slow DHT reads never stall thermal frames and
+# neither loop spins between samples.
+def sleep_until(deadline, period):
+    """Advance `deadline` by one period (never into the past) and sleep to it."""
+    deadline = max(deadline + period, time.monotonic())
+    time.sleep(max(0.0, deadline - time.monotonic()))
+    return deadline
+
+def dht_reading_thread(dht_sensors):
+    def read_dht(sensor):
+        try:
+            if sensor:
+                return sensor.temperature, sensor.humidity
+        except Exception as e:
+            logger.debug(f"DHT read error: {e}")
+        return None, None
+
+    # The four reads overlap: each one mostly waits on the sensor's bit-banged
+    # response, so a poll costs about one read instead of four.
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=len(dht_sensors))
+
+    deadline = time.monotonic()
     while True:
-        current_time = time.monotonic()
-
-        # --- READ DHTs ---
-        if (current_time - last_dht_read_time) > DHT_POLL_INTERVAL:
-            def read_dht(sensor):
-                try:
-                    if sensor:
-                        return sensor.temperature, sensor.humidity
-                except Exception as e:
-                    logger.debug(f"DHT read error: {e}")
-                return None, None
-            
-            results = []
-            for s in dht_sensors:
-                results.append(read_dht(s))
-            
-            with data_lock:
-                time_str = datetime.datetime.now().strftime("%H:%M:%S")
-                # Update Sensors 1-4
-                for i in range(4):
-                    t, h = results[i]
-                    idx = i + 1
-                    latest_data["dht"][f"t{idx}"] = t
-                    latest_data["dht"][f"h{idx}"] = h
-                    if t is not None:
-                        latest_data["dht_history"][idx]["time"].append(time_str)
-                        latest_data["dht_history"][idx]["temp"].append(t)
-                        latest_data["dht_history"][idx]["hum"].append(h)
-
-            last_dht_read_time = current_time
-
-        # --- READ THERMAL CAMERA ---
-        if mlx:
-            try:
-                mlx.getFrame(raw_frame)
-                frame_arr = np.array(raw_frame).reshape((MLX_HEIGHT, MLX_WIDTH))
-                
-                if np.max(frame_arr) > 150:
-                    time.sleep(0.1)
-                    continue
+        results = list(pool.map(read_dht, dht_sensors))
+        # None -> NaN on conversion to a float array
+        latest_data["dht"] = {"t": np.array([t for t, _ in results], dtype=np.float32),
+                              "h": np.array([h for _, h in results], dtype=np.float32)}
 
+        with data_lock:
+            now = now_stamp()
+            # Update Sensors 1-4
+            for i, (t, h) in enumerate(results):
+                idx = i + 1
+                if t is not None:
+                    hist = latest_data["dht_history"][idx]
+                    slot = latest_data["dht_count"][idx] % MAX_HISTORY
+                    hist["time"][slot] = now
+                    hist["temp"][slot] = t
+                    hist["hum"][slot] = h
+                    latest_data["dht_count"][idx] += 1
+
+        deadline = sleep_until(deadline, DHT_POLL_INTERVAL)
+
+if njit:
+    @njit(cache=True, fastmath=True)
+    def frame_stats(a):
+        """(min, max, mean) of a flat frame in one pass."""
+        mn = a[0]; mx = a[0]; total = 0.0
+        for v in a:
+            if v < mn: mn = v
+            if v > mx: mx = v
+            total += v
+        return mn, mx, total / a.size
+else:
+    def frame_stats(a):
+        return a.min(), a.max(), a.mean(dtype=np.float32)
+
+def mlx_reading_thread(mlx):
+    # getFrame writes element-wise, so it fills a float32 buffer directly.
+    # Frames rotate through a small pool and are published by reference:
+    # a published buffer is only refilled two reads later, long after any
+    # callback has finished with it, so readers never need to copy.
+    frame_pool = [np.empty(MLX_WIDTH * MLX_HEIGHT, dtype=np.float32) for _ in range(3)]
+    pool_idx = 0
+
+    deadline = time.monotonic()
+    while True:
+        try:
+            raw_frame = frame_pool[pool_idx]
+            mlx.getFrame(raw_frame)
+            fmin, fmax, favg = frame_stats(raw_frame)
+            fmin, fmax, favg = float(fmin), float(fmax), float(favg)
+
+            # Glitched frame: drop it and wait for the next one
+            if fmax <= 150:
+                latest_data["mlx"] = {"frame": raw_frame.reshape((MLX_HEIGHT, MLX_WIDTH)),
+                                      "min": fmin, "max": fmax, "avg": favg}
                 with data_lock:
-                    latest_data["mlx_frame"] = frame_arr.copy()
-                    time_str = datetime.datetime.now().strftime("%H:%M:%S")
-                    latest_data["mlx_stats"]["time"].append(time_str)
-                    latest_data["mlx_stats"]["min"].append(float(np.min(frame_arr)))
-                    latest_data["mlx_stats"]["max"].append(float(np.max(frame_arr)))
-                    latest_data["mlx_stats"]["avg"].append(float(np.mean(frame_arr)))
-            except Exception as e:
-                logger.debug(f"MLX read error: {e}")
-                time.sleep(0.2)
-        else:
-            time.sleep(DASH_REFRESH_INTERVAL / 1000.0)
+                    stats = latest_data["mlx_stats"]
+                    slot = latest_data["mlx_count"] % MAX_HISTORY
+                    stats["time"][slot] = now_stamp()
+                    stats["min"][slot] = fmin
+                    stats["max"][slot] = fmax
+                    stats["avg"][slot] = favg
+                    latest_data["mlx_count"] += 1
+                pool_idx = (pool_idx + 1) % len(frame_pool)
+        except Exception as e:
+            logger.debug(f"MLX read error: {e}")
+
+        deadline = sleep_until(deadline, MLX_FRAME_PERIOD)
 
 # ---------------------------
 # Email helpers
 # ---------------------------
+# Email images reuse two long-lived Agg figures instead of building a pyplot
+# figure per alert. Drawing is serialised so the figures stay safe to share.
+image_lock = threading.Lock()
+PNG_KWARGS = {'compress_level': 1}  # fast DEFLATE; a few KB larger is fine for email
+EMAIL_DPI = 72  # 5x4 in -> 360x288 px, plenty for an inline attachment
+# Artists are built once and only their data/text change per render; layout
+# is computed by one tight_layout() after the first real population.
+laid_out = set()
+
+def layout_once(fig):
+    if fig not in laid_out:
+        fig.tight_layout()
+        laid_out.add(fig)
+
+thermal_fig = Figure(figsize=(5,4), dpi=EMAIL_DPI)
+thermal_canvas = FigureCanvasAgg(thermal_fig)
+thermal_ax = thermal_fig.add_subplot(111)
+thermal_im = thermal_ax.imshow(np.zeros((MLX_HEIGHT, MLX_WIDTH)), cmap='inferno')
+thermal_fig.colorbar(thermal_im, ax=thermal_ax, label='Temp (°C)')
+thermal_ax.set_title('Thermal Snapshot')
+thermal_ax.set_axis_off()
+
+dht_fig = Figure(figsize=(6,3), dpi=EMAIL_DPI)
+dht_canvas = FigureCanvasAgg(dht_fig)
+dht_ax = dht_fig.add_subplot(111)
+dht_ax.xaxis_date()  # lines start empty, so set the datetime64 converter up front
+dht_temp_line, = dht_ax.plot([], [], color='red', label='Temp (°C)')
+dht_hum_line, = dht_ax.plot([], [], color='blue', label='Humidity (%)')
+dht_title_text = dht_ax.set_title('History')
+dht_ax.legend()
+dht_ax.grid(True)
+
 def generate_thermal_image_bytes(frame):
     buf = io.BytesIO()
     try:
-        plt.figure(figsize=(5,4))
-        plt.imshow(frame, cmap='inferno')
-        plt.colorbar(label='Temp (°C)')
-        plt.title('Thermal Snapshot')
-        plt.axis('off')
-        plt.savefig(buf, format='png', bbox_inches='tight')
-        plt.close()
-        buf.seek(0)
-        return buf.read()
+        with image_lock:
+            thermal_im.set_data(frame)
+            thermal_im.set_clim(np.min(frame), np.max(frame))  # colorbar follows
+            layout_once(thermal_fig)
+            thermal_canvas.print_png(buf, pil_kwargs=PNG_KWARGS)
+        return buf.getvalue()
     except Exception as e:
         logger.exception(f"Thermal generation failed: {e}")
         return None
@@ -256,77 +365,202 @@ def generate_dht_history_image(sensor_idx, sensor_name):
     buf = io.BytesIO()
     try:
         with data_lock:
-            times = list(latest_data["dht_history"][sensor_idx]["time"])
-            temps = list(latest_data["dht_history"][sensor_idx]["temp"])
-            hums = list(latest_data["dht_history"][sensor_idx]["hum"])
-        
-        if not times: return None
-
-        plt.figure(figsize=(6,3))
-        plt.plot(times, temps, color='red', label='Temp (°C)')
-        plt.plot(times, hums, color='blue', label='Humidity (%)')
-        plt.title(f'History: {sensor_name}')
-        plt.legend()
-        plt.grid(True)
-        if len(times) > 5:
-            plt.xticks([times[0], times[-1]]) 
+            hist = ring_snapshot(latest_data["dht_history"][sensor_idx], latest_data["dht_count"][sensor_idx])
+        times, temps, hums = hist["time"], hist["temp"], hist["hum"]
         
-        plt.savefig(buf, format='png', bbox_inches='tight')
-        plt.close()
-        buf.seek(0)
-        return buf.read()
+        if not len(times): return None
+
+        with image_lock:
+            dht_temp_line.set_data(times, temps)
+            dht_hum_line.set_data(times, hums)
+            dht_title_text.set_text(f'History: {sensor_name}')
+            dht_ax.relim()
+            dht_ax.autoscale_view()
+            if len(times) > 5:
+                dht_ax.set_xticks([times[0], times[-1]])
+            else:
+                dht_ax.xaxis.set_major_locator(AutoDateLocator())
+            layout_once(dht_fig)
+            dht_canvas.print_png(buf, pil_kwargs=PNG_KWARGS)
+        return buf.getvalue()
     except Exception as e:
         logger.exception(f"DHT graph generation failed: {e}")
         return None
 
-# UPDATED: Accepts a list of bad sensors [(idx, name), (idx, name)]
-def send_alert_email_thread(target_email, subject, body, frame, failed_sensors=None):
-    def runner():
-        if not GMAIL_EMAIL or not GMAIL_APP_PASSWORD:
-            return
+# Alerts are queued to one worker that keeps a logged-in SMTP_SSL session,
+# so the TLS handshake and AUTH are paid once rather than per email.
+alert_queue = queue.Queue()
+
+# Accepts a list of bad sensors [(idx, name), (idx, name)]
+def build_alert_message(target_email, subject, body, frame, failed_sensors=None):
+    msg = MIMEMultipart()
+    msg['From'] = GMAIL_EMAIL
+    msg['To'] = target_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
+
+    # 1. Attach Thermal Image (if it exists)
+    if frame is not None:
+        img_data = generate_thermal_image_bytes(frame)
+        if img_data:
+            msg.attach(MIMEImage(img_data, name='thermal_snapshot.png'))
+    
+    # 2. Attach Graphs for ALL failed sensors
+    if failed_sensors:
+        for idx, name in failed_sensors:
+            dht_img_data = generate_dht_history_image(idx, name)
+            if dht_img_data:
+                # Create unique filename for each attachment
+                filename = f'{name.replace(" ","_")}_history.png'
+                msg.attach(MIMEImage(dht_img_data, name=filename))
+    return msg
+
+def send_alert_email(target_email, subject, body, frame, failed_sensors=None):
+    if not GMAIL_EMAIL or not GMAIL_APP_PASSWORD:
+        return
+    alert_queue.put((target_email, subject, body, frame, failed_sensors))
+
+def close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+def smtp_connect():
+    conn = smtplib.SMTP_SSL(SMTP_SERVER, SMTP_PORT, timeout=15)
+    try:
+        conn.login(GMAIL_EMAIL, GMAIL_APP_PASSWORD)
+    except Exception:
+        close_quietly(conn)
+        raise
+    return conn
+
+def email_worker():
+    conn = None
+    while True:
+        target_email, subject, body, frame, failed_sensors = alert_queue.get()
         try:
-            msg = MIMEMultipart()
-            msg['From'] = GMAIL_EMAIL
-            msg['To'] = target_email
-            msg['Subject'] = subject
-            msg.attach(MIMEText(body, 'plain'))
-
-            # 1. Attach Thermal Image (if it exists)
-            if frame is not None:
-                img_data = generate_thermal_image_bytes(frame)
-                if img_data:
-                    msg.attach(MIMEImage(img_data, name='thermal_snapshot.png'))
-            
-            # 2. Attach Graphs for ALL failed sensors
-            if failed_sensors:
-                for idx, name in failed_sensors:
-                    dht_img_data = generate_dht_history_image(idx, name)
-                    if dht_img_data:
-                        # Create unique filename for each attachment
-                        filename = f'{name.replace(" ","_")}_history.png'
-                        msg.attach(MIMEImage(dht_img_data, name=filename))
-
-            server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=15)
-            server.starttls()
-            server.login(GMAIL_EMAIL, GMAIL_APP_PASSWORD)
-            server.send_message(msg)
-            server.quit()
-            logger.info(f"Email sent to {target_email} with {len(failed_sensors) if failed_sensors else 0} graphs.")
+            msg = build_alert_message(target_email, subject, body, frame, failed_sensors)
         except Exception as e:
-            logger.error(f"Email failed: {e}")
+            logger.error(f"Email build failed: {e}")
+            continue
+        # A session idle past the server timeout fails on first use: close
+        # it, reconnect once and retry. Anything else (refused recipients,
+        # DATA errors, bad login) is permanent for this message, and a resend
+        # could deliver it twice.
+        for attempt in range(2):
+            try:
+                if conn is None:
+                    conn = smtp_connect()
+                conn.send_message(msg)
+                logger.info(f"Email sent to {target_email} with {len(failed_sensors) if failed_sensors else 0} graphs.")
+                break
+            except smtplib.SMTPServerDisconnected as e:
+                err = e
+            except smtplib.SMTPException as e:  # OSError subclass, so before it
+                logger.error(f"Email failed: {e}")
+                break
+            except OSError as e:
+                err = e
+            except Exception as e:
+                logger.error(f"Email failed: {e}")
+                break
+            if conn is not None:
+                close_quietly(conn)
+                conn = None
+            if attempt:
+                logger.error(f"Email failed: {err}")
 
-    t = threading.Thread(target=runner, daemon=True)
-    t.start()
+# ---------------------------
+# Figure skeletons
+# ---------------------------
+# Graphs are seeded once from the layout; the callback only patches data and
+# titles, so colorscales and trace styling never cross the wire again.
+GRAPH_MARGIN = dict(l=20, r=20, t=30, b=20)
+DEFAULT_SENSOR_NAMES = ['Sensor 1', 'Sensor 2', 'Sensor 3', 'Sensor 4']
+
+def make_heatmap_fig():
+    fig = go.Figure(data=[go.Heatmap(z=np.zeros((MLX_HEIGHT, MLX_WIDTH)), colorscale='Inferno')])
+    fig.update_layout(title='Max: --', yaxis=dict(autorange='reversed', scaleanchor='x'))
+    return fig
+
+def make_history_fig():
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=[], y=[], name='Max'))
+    fig.add_trace(go.Scatter(x=[], y=[], name='Avg'))
+    fig.update_layout(title='Thermal Trends', margin=GRAPH_MARGIN)
+    return fig
+
+def make_dht_fig(name):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=[], y=[], name='Temp', line=dict(color='red')))
+    fig.add_trace(go.Scatter(x=[], y=[], name='Hum', line=dict(color='blue')))
+    fig.update_layout(title=name, margin=GRAPH_MARGIN,
+                      legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    return fig
+
+def lttb_indices(x, y, n_out):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps out of (x, y)."""
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    # datetime64 only casts to float via its int64 epoch count
+    x = x.astype(np.int64).astype(np.float64); y = y.astype(np.float64)
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    out = np.empty(n_out, dtype=np.intp)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nhi = edges[b + 2] if b + 2 < len(edges) else n
+        cx, cy = x[hi:nhi].mean(), y[hi:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[b + 1] = a
+    return out
+
+def history_update(fig, hist, count, seen, keys):
+    """Fill `fig` (a Patch) and build extendData for one history graph.
+
+    Only samples newer than the client's cursor `seen` are sent; extendData
+    trims the traces to MAX_HISTORY in the browser. A missing or stale cursor
+    (new tab, server restart, or further behind than the ring holds) gets
+    the traces replaced wholesale instead. Histories longer than
+    HISTORY_PLOT_POINTS are always sent whole, LTTB-decimated to that size."""
+    fresh = count - seen if seen is not None else -1
+    if not fresh:
+        return fig, no_update
+    n = len(hist['time'])
+    if fresh < 0 or fresh > n or n > HISTORY_PLOT_POINTS:
+        for i, k in enumerate(keys):
+            keep = lttb_indices(hist['time'], hist[k], HISTORY_PLOT_POINTS)
+            fig['data'][i]['x'] = hist['time'][keep]
+            fig['data'][i]['y'] = hist[k][keep]
+        return fig, no_update
+    ext = dict(x=[hist['time'][-fresh:]] * len(keys), y=[hist[k][-fresh:] for k in keys])
+    return fig, (ext, list(range(len(keys))), MAX_HISTORY)
 
 # ---------------------------
 # Dash app
 # ---------------------------
+# Dash encodes callback output through plotly.io.json; with orjson the
+# float32 frame and history arrays are written straight from their buffers
+# (OPT_SERIALIZE_NUMPY) instead of being walked by the stdlib encoder.
+if orjson:
+    pio.json.config.default_engine = 'orjson'
+
 app = dash.Dash(__name__)
 app.title = "Server Room Monitor"
 
 app.layout = html.Div(style={'fontFamily':'Arial','maxWidth':'1200px','margin':'0 auto'}, children=[
     html.H1("Server Room Monitor (4x Sensor Array)", style={'textAlign':'center'}),
     dcc.Interval(id='interval-component', interval=DASH_REFRESH_INTERVAL, n_intervals=0),
+    dcc.Store(id='sensor-names', data=DEFAULT_SENSOR_NAMES),
+    # Per-graph history cursors, see history_update()
+    dcc.Store(id='cursor-mlx'),
+    dcc.Store(id='cursor-dht-1'), dcc.Store(id='cursor-dht-2'),
+    dcc.Store(id='cursor-dht-3'), dcc.Store(id='cursor-dht-4'),
     
     html.Div(style={'backgroundColor':'#f0f0f0','padding':'15px','borderRadius':'10px','marginBottom':'20px'}, children=[
         html.H3("⚙️ Alert Configuration"),
@@ -376,19 +610,19 @@ app.layout = html.Div(style={'fontFamily':'Arial','maxWidth':'1200px','margin':'
         html.Div(style={'flex':'50%','padding':10}, children=[
             html.H3("Thermal Feed"), 
             dcc.Checklist(id='view-options', options=[{'label':' Show Values','value':'text'},{'label':' Force Square Pixels','value':'square'}], value=['square'], inline=True), 
-            dcc.Graph(id='thermal-heatmap', style={'height':'500px'}),
+            dcc.Graph(id='thermal-heatmap', figure=make_heatmap_fig(), style={'height':'500px'}),
             html.H3("Thermal History", style={'marginTop':'20px'}),
-            dcc.Graph(id='mlx-history-graph', style={'height':'300px'})
+            dcc.Graph(id='mlx-history-graph', figure=make_history_fig(), style={'height':'300px'})
         ]),
         
         # DHT Column (2x2 Grid)
         html.Div(style={'flex':'50%','padding':10}, children=[
             html.H3("DHT Sensors (Temp & Hum History)"), 
             html.Div(style={'display':'flex', 'flexWrap':'wrap'}, children=[
-                html.Div([dcc.Graph(id='dht-graph-1', style={'height':'200px'})], style={'width':'50%'}),
-                html.Div([dcc.Graph(id='dht-graph-2', style={'height':'200px'})], style={'width':'50%'}),
-                html.Div([dcc.Graph(id='dht-graph-3', style={'height':'200px'})], style={'width':'50%'}),
-                html.Div([dcc.Graph(id='dht-graph-4', style={'height':'200px'})], style={'width':'50%'})
+                html.Div([dcc.Graph(id='dht-graph-1', figure=make_dht_fig('Sensor 1'), style={'height':'200px'})], style={'width':'50%'}),
+                html.Div([dcc.Graph(id='dht-graph-2', figure=make_dht_fig('Sensor 2'), style={'height':'200px'})], style={'width':'50%'}),
+                html.Div([dcc.Graph(id='dht-graph-3', figure=make_dht_fig('Sensor 3'), style={'height':'200px'})], style={'width':'50%'}),
+                html.Div([dcc.Graph(id='dht-graph-4', figure=make_dht_fig('Sensor 4'), style={'height':'200px'})], style={'width':'50%'})
             ]),
             html.Div(id='dht-status-display', style={'marginTop':'10px', 'fontWeight':'bold'})
         ]),
@@ -402,32 +636,132 @@ def toggle_inputs(selection):
     else: 
         return {'display':'none'}, {'display':'flex','flex':2,'gap':'20px'}
 
-@app.callback([Output('dht-status-display','children'),
-               Output('thermal-heatmap','figure'), Output('mlx-history-graph','figure'),
-               Output('dht-graph-1','figure'), Output('dht-graph-2','figure'),
-               Output('dht-graph-3','figure'), Output('dht-graph-4','figure'),
-               Output('alert-status-div','children')],
+# Each output has its own callback so a tick or a keystroke only runs the
+# work it feeds: renames land in a Store read as State by the plots, and the
+# alert check is the only callback triggered by the threshold inputs.
+@app.callback(Output('sensor-names','data'),
+              [Input('name-s1','value'), Input('name-s2','value'),
+               Input('name-s3','value'), Input('name-s4','value')])
+def store_sensor_names(ns1, ns2, ns3, ns4):
+    return sensor_name_tuple(ns1, ns2, ns3, ns4)
+
+@functools.lru_cache(maxsize=4)
+def sensor_name_tuple(ns1, ns2, ns3, ns4):
+    return (ns1 or "S1", ns2 or "S2", ns3 or "S3", ns4 or "S4")
+
+@app.callback(Output('thermal-heatmap','figure'),
+              [Input('interval-component','n_intervals'), Input('view-options','value')],
+              [State('input-thermal-temp','value')])
+def update_heatmap(n, view_opts, thermal_lim):
+    mlx = latest_data["mlx"]
+    frame, t_min, t_max = mlx["frame"], mlx["min"], mlx["max"]
+    if t_min == t_max: t_max = t_min + 1.0
+    fig = Patch()
+    fig['data'][0]['z'] = frame
+    fig['data'][0]['zmin'] = t_min
+    fig['data'][0]['zmax'] = t_max
+    # Text overlay is attached only while enabled, and cleared once on toggle-off
+    if 'text' in view_opts:
+        fig['data'][0]['text'] = frame.round(0).astype(np.int16)
+        fig['data'][0]['texttemplate'] = "%{text}"
+        fig['data'][0]['textfont'] = {"size":10}
+    elif ctx.triggered_id == 'view-options':
+        fig['data'][0]['text'] = None
+        fig['data'][0]['texttemplate'] = None
+    title = f'Max: {t_max:.1f}°C'
+    # Hotspots against the limit the alerts are using, not the default
+    if thermal_lim is not None:
+        hot = int(np.count_nonzero(frame > thermal_lim))
+        if hot: title += f' | {hot} px > {thermal_lim:g}°C'
+    fig['layout']['title'] = title
+    fig['layout']['yaxis']['scaleanchor'] = 'x' if 'square' in view_opts else None
+    return fig
+
+@app.callback([Output('mlx-history-graph','figure'), Output('mlx-history-graph','extendData'),
+               Output('cursor-mlx','data')],
+              [Input('interval-component','n_intervals')],
+              [State('cursor-mlx','data')])
+def update_mlx_history(n, seen):
+    with data_lock:
+        count = latest_data["mlx_count"]
+        stats = ring_snapshot(latest_data["mlx_stats"], count, ('time', 'max', 'avg'))
+    fig, ext = history_update(Patch(), stats, count, seen, ('max', 'avg'))
+    return fig, ext, count
+
+def dht_title(name, current_t):
+    return f"{name}: {current_t:.1f}°C" if np.isfinite(current_t) else f"{name}"
+
+def register_dht_graph(idx):
+    @app.callback([Output(f'dht-graph-{idx}','figure'), Output(f'dht-graph-{idx}','extendData'),
+                   Output(f'cursor-dht-{idx}','data')],
+                  [Input('interval-component','n_intervals')],
+                  [State('sensor-names','data'), State(f'cursor-dht-{idx}','data')])
+    def update_dht_graph(n, names, seen):
+        current_t = float(latest_data["dht"]["t"][idx - 1])
+        with data_lock:
+            count = latest_data["dht_count"][idx]
+            hist = ring_snapshot(latest_data["dht_history"][idx], count)
+        fig = Patch()
+        fig['layout']['title'] = dht_title((names or DEFAULT_SENSOR_NAMES)[idx - 1], current_t)
+        fig, ext = history_update(fig, hist, count, seen, ('temp', 'hum'))
+        return fig, ext, count
+
+for i in range(1, 5):
+    register_dht_graph(i)
+
+# A rename retitles its graph right away instead of waiting for the next tick
+@app.callback([Output(f'dht-graph-{i}','figure', allow_duplicate=True) for i in range(1, 5)],
+              [Input('name-s1','value'), Input('name-s2','value'),
+               Input('name-s3','value'), Input('name-s4','value')],
+              prevent_initial_call=True)
+def retitle_dht_graph(ns1, ns2, ns3, ns4):
+    outs = [no_update] * 4
+    trig = ctx.triggered_id
+    if trig and trig.startswith('name-s'):
+        idx = int(trig[-1]) - 1
+        fig = Patch()
+        fig['layout']['title'] = dht_title(sensor_name_tuple(ns1, ns2, ns3, ns4)[idx],
+                                           float(latest_data["dht"]["t"][idx]))
+        outs[idx] = fig
+    return outs
+
+@app.callback(Output('dht-status-display','children'),
+              [Input('interval-component','n_intervals')],
+              [State('sensor-names','data')])
+def update_dht_status(n, names):
+    dht = latest_data["dht"]
+    temps, hums = dht["t"], dht["h"]
+    names = names or DEFAULT_SENSOR_NAMES
+    status_lines = []
+    for name, t, h in zip(names, temps, hums):
+        s_text = f"{name}: {t:.1f}°C / {h:.1f}% | " if not np.isnan(t) else f"{name}: -- | "
+        status_lines.append(html.Span(s_text))
+    return [html.Div(status_lines)]
+
+@app.callback(Output('alert-status-div','children'),
               [Input('interval-component','n_intervals'),
                Input('alert-source-selector','value'),
-               Input('view-options','value'),
                Input('input-dht-temp','value'),
                Input('input-dht-hum-min','value'),
                Input('input-dht-hum-max','value'),
                Input('input-thermal-temp','value'),
                Input('thermal-mode-select','value'),
-               Input('input-email-addr','value'),
-               Input('name-s1','value'), Input('name-s2','value'), 
-               Input('name-s3','value'), Input('name-s4','value')])
-def update_dashboard(n, alert_source, view_opts, dht_temp_lim, dht_hum_min, dht_hum_max, thermal_lim, thermal_mode, email_addr, ns1, ns2, ns3, ns4):
+               Input('input-email-addr','value')],
+              [State('sensor-names','data')])
+def update_alerts(n, alert_source, dht_temp_lim, dht_hum_min, dht_hum_max, thermal_lim, thermal_mode, email_addr, names):
     global last_alert_time
-    with data_lock:
-        dht = latest_data["dht"].copy()
-        dht_hist = {k: {nk: list(nv) for nk, nv in v.items()} for k, v in latest_data["dht_history"].items()}
-        frame = latest_data["mlx_frame"].copy()
-        stats = {k: list(v) for k,v in latest_data["mlx_stats"].items()}
+    # Nothing to evaluate without somewhere to send the alert
+    if not email_addr:
+        return ""
+    if not EMAIL_RE.match(email_addr):
+        return "⚠️ Invalid Email Address format"
 
-    # Map indices to names
-    sensor_names = {1: ns1 or "S1", 2: ns2 or "S2", 3: ns3 or "S3", 4: ns4 or "S4"}
+    dht = latest_data["dht"]
+    temps, hums = dht["t"], dht["h"]
+    mlx = latest_data["mlx"]
+
+    # Names by sensor index 0-3
+    sensor_names = names or DEFAULT_SENSOR_NAMES
 
     alert_msg = ""
     triggers = []
@@ -440,117 +774,57 @@ def update_dashboard(n, alert_source, view_opts, dht_temp_lim, dht_hum_min, dht_
     failed_sensors = [] 
 
     current_time = time.time()
-    valid_email = email_addr and "@" in email_addr and "." in email_addr
-
-    if valid_email:
-        # Check DHT Alerts
-        if alert_source == 'dht' and dht_temp_lim is not None:
-            for i in range(1, 5):
-                t_val = dht[f't{i}']
-                h_val = dht[f'h{i}']
-                s_name = sensor_names[i]
-                
-                sensor_failed = False
-
-                if t_val is not None and t_val > dht_temp_lim: 
-                    triggers.append(f"{s_name} Exhaust Temp: {t_val:.1f}C")
-                    is_dht_temp_alert = True
-                    sensor_failed = True
-                
-                if h_val is not None and dht_hum_min is not None and dht_hum_max is not None:
-                    if h_val < dht_hum_min:
-                        triggers.append(f"{s_name} Low Humidity: {h_val:.1f}%")
-                        is_dht_hum_alert = True
-                        sensor_failed = True
-                    elif h_val > dht_hum_max:
-                        triggers.append(f"{s_name} High Humidity: {h_val:.1f}%")
-                        is_dht_hum_alert = True
-                        sensor_failed = True
-                
-                # If this sensor failed either check, add to list for graph generation
-                if sensor_failed:
-                    failed_sensors.append((i, s_name))
-        
-        # Check Thermal Alerts
-        if alert_source == 'thermal' and thermal_lim is not None:
-            val = float(np.max(frame)) if thermal_mode == 'max' else float(np.mean(frame))
-            if val > thermal_lim: 
-                triggers.append(f"Thermal {thermal_mode.upper()}: {val:.1f}C")
-                is_thermal_alert = True
-        
-        # Construct Nuanced Subject Line
-        if triggers:
-            alert_msg = f"⚠️ Alert: {', '.join(triggers)}"
-            if (current_time - last_alert_time) > ALERT_COOLDOWN:
-                subject_parts = []
-                if is_dht_temp_alert: subject_parts.append("AIRFLOW OVERHEAT")
-                if is_thermal_alert:  subject_parts.append("THERMAL HOTSPOT")
-                if is_dht_hum_alert:  subject_parts.append("HUMIDITY OUT OF RANGE")
-                
-                if not subject_parts: subject = "SENSOR ALERT"
-                else: subject = "CRITICAL: " + " + ".join(subject_parts)
-
-                body = "The following limits were breached:\n\n" + "\n".join(triggers)
-                
-                # Pass the LIST of failed sensors to email thread
-                send_alert_email_thread(email_addr, subject, body, frame, failed_sensors)
-                
-                last_alert_time = current_time
-                alert_msg += " (Email Sent)"
-            else:
-                alert_msg += f" (Cooldown: {int(ALERT_COOLDOWN - (current_time - last_alert_time))}s)"
-    elif email_addr:
-        alert_msg = "⚠️ Invalid Email Address format"
-
-    # --- PLOTTING ---
-
-    # Heatmap
-    try:
-        t_min = float(np.min(frame)); t_max = float(np.max(frame))
-    except Exception:
-        frame = np.zeros((MLX_HEIGHT, MLX_WIDTH)); t_min, t_max = 0.0, 1.0
-    if t_min == t_max: t_max = t_min + 1.0
-    text_data = frame.round(0).astype(int) if 'text' in view_opts else None
-
-    heatmap_fig = go.Figure(data=[go.Heatmap(z=frame, zmin=t_min, zmax=t_max, colorscale='Inferno',
-                                            text=text_data, texttemplate="%{text}", textfont={"size":10})])
-    layout_args = dict(title=f'Max: {t_max:.1f}°C', yaxis=dict(autorange='reversed'))
-    if 'square' in view_opts: layout_args['yaxis']['scaleanchor'] = 'x'
-    heatmap_fig.update_layout(**layout_args)
-
-    # Thermal History
-    history_fig = go.Figure()
-    history_fig.add_trace(go.Scatter(x=stats.get('time',[]), y=stats.get('max',[]), name='Max'))
-    history_fig.add_trace(go.Scatter(x=stats.get('time',[]), y=stats.get('avg',[]), name='Avg'))
-    history_fig.update_layout(title='Thermal Trends', margin=dict(l=20, r=20, t=30, b=20))
-
-    # 4 Individual DHT Line Graphs
-    dht_figs = []
-    for i in range(1, 5):
-        dh = dht_hist[i]
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=dh['time'], y=dh['temp'], name='Temp', line=dict(color='red')))
-        fig.add_trace(go.Scatter(x=dh['time'], y=dh['hum'], name='Hum', line=dict(color='blue')))
-        
-        current_t = dht[f't{i}']
-        name = sensor_names[i]
-        title_str = f"{name}: {current_t:.1f}°C" if current_t else f"{name}"
-        
-        fig.update_layout(title=title_str, 
-                          margin=dict(l=20, r=20, t=30, b=20),
-                          legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
-        dht_figs.append(fig)
 
-    # Text Status
-    status_lines = []
-    for i in range(1, 5):
-        t = dht[f't{i}']
-        h = dht[f'h{i}']
-        name = sensor_names[i]
-        s_text = f"{name}: {t:.1f}°C / {h:.1f}% | " if t is not None else f"{name}: -- | "
-        status_lines.append(html.Span(s_text))
+    # Check DHT Alerts
+    if alert_source == 'dht' and dht_temp_lim is not None:
+        # NaN (no reading) compares False, so dead sensors never trip
+        hot = temps > dht_temp_lim
+        if dht_hum_min is not None and dht_hum_max is not None:
+            low = hums < dht_hum_min
+            high = ~low & (hums > dht_hum_max)
+        else:
+            low = high = np.zeros(4, dtype=bool)
+        is_dht_temp_alert = bool(hot.any())
+        is_dht_hum_alert = bool((low | high).any())
+
+        # Strings are only built for the sensors that failed
+        for i in np.flatnonzero(hot | low | high):
+            s_name = sensor_names[i]
+            if hot[i]: triggers.append(f"{s_name} Exhaust Temp: {temps[i]:.1f}C")
+            if low[i]: triggers.append(f"{s_name} Low Humidity: {hums[i]:.1f}%")
+            elif high[i]: triggers.append(f"{s_name} High Humidity: {hums[i]:.1f}%")
+            # Failed sensors get a history graph in the email
+            failed_sensors.append((int(i) + 1, s_name))
     
-    return [html.Div(status_lines)], heatmap_fig, history_fig, dht_figs[0], dht_figs[1], dht_figs[2], dht_figs[3], alert_msg
+    # Check Thermal Alerts
+    if alert_source == 'thermal' and thermal_lim is not None:
+        val = mlx["max"] if thermal_mode == 'max' else mlx["avg"]
+        if val > thermal_lim: 
+            triggers.append(f"Thermal {thermal_mode.upper()}: {val:.1f}C")
+            is_thermal_alert = True
+    
+    # Construct Nuanced Subject Line
+    if triggers:
+        alert_msg = f"⚠️ Alert: {', '.join(triggers)}"
+        if (current_time - last_alert_time) > ALERT_COOLDOWN:
+            subject_parts = []
+            if is_dht_temp_alert: subject_parts.append("AIRFLOW OVERHEAT")
+            if is_thermal_alert:  subject_parts.append("THERMAL HOTSPOT")
+            if is_dht_hum_alert:  subject_parts.append("HUMIDITY OUT OF RANGE")
+            
+            if not subject_parts: subject = "SENSOR ALERT"
+            else: subject = "CRITICAL: " + " + ".join(subject_parts)
+
+            body = "The following limits were breached:\n\n" + "\n".join(triggers)
+            
+            # Pass the LIST of failed sensors to the email worker
+            send_alert_email(email_addr, subject, body, mlx["frame"].copy(), failed_sensors)
+            
+            last_alert_time = current_time
+            alert_msg += " (Email Sent)"
+        else:
+            alert_msg += f" (Cooldown: {int(ALERT_COOLDOWN - (current_time - last_alert_time))}s)"
+    return alert_msg
 
 # ---------------------------
 # Entrypoint
@@ -561,6 +835,15 @@ if __name__ == "__main__":
         logger.warning("Email creds missing. Email disabled.")
     
     dht_sensors, mlx = setup_sensors()
-    threading.Thread(target=sensor_reading_thread, args=(dht_sensors, mlx), daemon=True).start()
+    threading.Thread(target=dht_reading_thread, args=(dht_sensors,), daemon=True).start()
+    if mlx:
+        threading.Thread(target=mlx_reading_thread, args=(mlx,), daemon=True).start()
+    threading.Thread(target=email_worker, daemon=True).start()
     
-    app.run(host='0.0.0.0', port=8050, debug=False, use_reloader=False)
+    if serve:
+        # One process, so latest_data stays shared; threads keep the seven
+        # per-tick callbacks of each tab from queueing behind one another
+        serve(app.server, host='0.0.0.0', port=8050, threads=DASH_THREADS)
+    else:
+        logger.warning("waitress not installed; falling back to the Flask dev server.")
+        app.run(host='0.0.0.0', port=8050, debug=False, use_reloader=False)
@@ -1,6 +1,13 @@
 # server.py
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import threading
+import numpy as np
+
+# Optional binary encoding for /api/get_data; JSON stays the default
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 app = Flask(__name__)
 
@@ -9,8 +16,12 @@ data_lock = threading.Lock()
 latest_data = {
     "t1": None, "h1": None,
     "t2": None, "h2": None,
-    "thermal_image": None  # Added field for the camera data
 }
+# Camera frame kept as packed row-major uint8 bytes (24x32), served as-is.
+# Temps are quantized over the dashboard's 20-60°C color range: 40/255 =
+# 0.16°C per step, finer than the MLX90640's own noise.
+THERMAL_QMIN, THERMAL_QMAX = 20.0, 60.0
+latest_thermal = None
 
 print("Starting Flask server...")
 
@@ -18,18 +29,23 @@ print("Starting Flask server...")
 @app.route('/api/data', methods=['POST'])
 def receive_data():
     """Endpoint to receive all sensor data from the detector script."""
-    global latest_data
+    global latest_data, latest_thermal
     if not request.json:
         return jsonify({"status": "error", "message": "Invalid JSON"}), 400
 
     data = request.json
+    thermal_image = data.get("thermal_image")
+    thermal = None
+    if thermal_image:
+        scaled = (np.asarray(thermal_image, dtype=np.float32) - THERMAL_QMIN) * (255 / (THERMAL_QMAX - THERMAL_QMIN))
+        thermal = np.clip(np.rint(scaled), 0, 255).astype(np.uint8).tobytes()
     with data_lock:
         # Update with new data, using .get() for safety
         latest_data["t1"] = data.get("t1")
         latest_data["h1"] = data.get("h1")
         latest_data["t2"] = data.get("t2")
         latest_data["h2"] = data.get("h2")
-        latest_data["thermal_image"] = data.get("thermal_image")
+        latest_thermal = thermal
 
     return jsonify({"status": "success", "message": "Data received"}), 200
 
@@ -37,7 +53,20 @@ def receive_data():
 def get_data():
     """Endpoint for the web dashboard to fetch the latest data."""
     with data_lock:
-        return jsonify(latest_data.copy())
+        data = latest_data.copy()
+    # Clients that ask for msgpack get it, everyone else keeps JSON
+    if msgpack and request.accept_mimetypes.best_match(["application/json", "application/msgpack"]) == "application/msgpack":
+        return Response(msgpack.packb(data), mimetype="application/msgpack")
+    return jsonify(data)
+
+@app.route('/api/get_thermal', methods=['GET'])
+def get_thermal():
+    """Latest thermal frame as quantized uint8 bytes (24x32, row-major); 204 until one arrives."""
+    with data_lock:
+        thermal = latest_thermal
+    if thermal is None:
+        return "", 204
+    return Response(thermal, mimetype="application/octet-stream")
 
 # --- Run the App ---
 if __name__ == "__main__":
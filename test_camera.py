@@ -36,10 +36,11 @@ while True:
         # Get a new frame of temperature data
         mlx.getFrame(frame)
 
-        # Calculate some simple stats
-        temp_min = np.min(frame)
-        temp_max = np.max(frame)
-        temp_avg = np.mean(frame)
+        # Calculate some simple stats on one contiguous float32 copy
+        arr = np.ascontiguousarray(frame, dtype=np.float32)
+        temp_min = arr.min()
+        temp_max = arr.max()
+        temp_avg = arr.mean()
 
         # Print the stats to the console
         print(f"Min: {temp_min:0.2f}C  Max: {temp_max:0.2f}C  Avg: {temp_avg:0.2f}C")
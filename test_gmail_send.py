@@ -8,18 +8,58 @@ load_dotenv()
 EMAIL_SENDER = os.getenv("EMAIL_SENDER")
 EMAIL_PASSWORD = os.getenv("EMAIL_APP_PASSWORD")
 
-smtp = smtplib.SMTP("smtp.gmail.com", 587)
-smtp.set_debuglevel(1)
-smtp.ehlo()
-smtp.starttls()
-smtp.ehlo()
-smtp.login(EMAIL_SENDER, EMAIL_PASSWORD)
-
-smtp.sendmail(
-    EMAIL_SENDER,
-    EMAIL_SENDER,
-    "Subject: Gmail Test\n\nThis is a test from the Raspberry Pi."
-)
-
-smtp.quit()
-print("Email test finished.")
+
+class GmailSender:
+    """One logged-in Gmail SMTP connection, reused across sends.
+
+    STARTTLS + LOGIN is paid once; each send checks the link with NOOP and
+    reconnects if Gmail has dropped it."""
+
+    def __init__(self, user=EMAIL_SENDER, password=EMAIL_PASSWORD, debug=0):
+        self.user = user
+        self.password = password
+        self.debug = debug
+        self.s = None
+        self.connect()
+
+    def connect(self):
+        if self.s is not None:
+            self.close()
+        s = smtplib.SMTP("smtp.gmail.com", 587)
+        try:
+            s.set_debuglevel(self.debug)
+            s.ehlo()
+            s.starttls()
+            s.ehlo()
+            s.login(self.user, self.password)
+        except Exception:
+            s.close()
+            raise
+        self.s = s
+
+    def send(self, to, message):
+        try:
+            alive = self.s is not None and self.s.noop()[0] == 250  # 421 = idle timeout
+        except (smtplib.SMTPException, OSError):
+            alive = False
+        if not alive:
+            self.connect()
+        try:
+            self.s.sendmail(self.user, to, message)
+        except smtplib.SMTPServerDisconnected:
+            # Dropped between the NOOP and the send; retry once
+            self.connect()
+            self.s.sendmail(self.user, to, message)
+
+    def close(self):
+        try:
+            self.s.quit()
+        except (smtplib.SMTPException, OSError):
+            self.s.close()
+        self.s = None
+
+if __name__ == "__main__":
+    sender = GmailSender(debug=1)
+    sender.send(EMAIL_SENDER, "Subject: Gmail Test\n\nThis is a test from the Raspberry Pi.")
+    sender.close()
+    print("Email test finished.")
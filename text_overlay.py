@@ -4,8 +4,11 @@ import busio
 import adafruit_mlx90640
 import numpy as np
 import pygame
+import threading
 import os
 
+from thermal_kernels import colorize
+
 # --- Pygame Setup ---
 pygame.init()
 pygame.font.init()
@@ -16,6 +19,13 @@ SCALE_FACTOR = 20
 SCREEN_WIDTH = SENSOR_WIDTH * SCALE_FACTOR
 SCREEN_HEIGHT = SENSOR_HEIGHT * SCALE_FACTOR
 
+# Center of each 20x20 cell on screen, in frame (row-major) order
+CELL_CENTERS = [(x * SCALE_FACTOR + (SCALE_FACTOR // 2), y * SCALE_FACTOR + (SCALE_FACTOR // 2))
+                for y in range(SENSOR_HEIGHT) for x in range(SENSOR_WIDTH)]
+# Screen rect of each cell, same order
+CELL_RECTS = [pygame.Rect(x * SCALE_FACTOR, y * SCALE_FACTOR, SCALE_FACTOR, SCALE_FACTOR)
+              for y in range(SENSOR_HEIGHT) for x in range(SENSOR_WIDTH)]
+
 # --- Font and Text Setup ---
 try:
     FONT_SIZE = 18
@@ -37,7 +47,60 @@ except pygame.error as e:
     print(f"Error initializing pygame display: {e}")
     exit()
 
-thermal_surface = pygame.Surface((SENSOR_WIDTH, SENSOR_HEIGHT))
+# Small and scaled heatmap surfaces, both in the display's pixel format
+thermal_surface = pygame.Surface((SENSOR_WIDTH, SENSOR_HEIGHT)).convert()
+scaled_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+
+# Pre-rendered labels for every whole degree we expect to see, in both colors;
+# anything outside the range is rendered once on first use and kept.
+# convert_alpha() (needs the display, hence down here) puts them in the
+# screen's pixel format so blits skip a per-call format conversion.
+def render_glyph(t, color):
+    return font.render(f"{t}", True, color).convert_alpha()
+
+GLYPHS = {color: {t: render_glyph(t, color) for t in range(-20, 151)}
+          for color in (TEXT_WHITE, TEXT_BLACK)}
+
+def get_glyph(temp, color):
+    t = int(round(float(temp)))
+    glyph = GLYPHS[color].get(t)
+    if glyph is None:
+        glyph = GLYPHS[color][t] = render_glyph(t, color)
+    return glyph
+
+# --- Dirty-cell redraw ---
+# Only cells whose label or color changed since the last frame are repainted,
+# together with their row neighbours: a label can spill into those, so its
+# old overflow has to be erased and its new one drawn there. Each repainted
+# cell gets its background from scaled_surface, then every label touching it,
+# clipped to the cell and in full-redraw order.
+N_CELLS = SENSOR_WIDTH * SENSOR_HEIGHT
+prev_key = np.full(N_CELLS, -1, dtype=np.int64)
+
+def row_neighbours(i):
+    return [j for j in (i - 1, i, i + 1)
+            if 0 <= j < N_CELLS and j // SENSOR_WIDTH == i // SENSOR_WIDTH]
+
+def draw_dirty_cells(changed, labels, black):
+    dirty = sorted({j for i in changed for j in row_neighbours(i)})
+    dirty_set = set(dirty)
+    blit_list = [(scaled_surface, CELL_RECTS[i], CELL_RECTS[i]) for i in dirty]
+    for j in sorted({k for i in dirty for k in row_neighbours(i)}):
+        glyph = get_glyph(labels[j], TEXT_BLACK if black[j] else TEXT_WHITE)
+        g = glyph.get_rect(center=CELL_CENTERS[j])
+        for i in row_neighbours(j):
+            if i in dirty_set:
+                c = g.clip(CELL_RECTS[i])
+                if c:
+                    blit_list.append((glyph, c, c.move(-g.x, -g.y)))
+    screen.blits(blit_list, doreturn=False)
+    pygame.display.update([CELL_RECTS[i] for i in dirty])
+
+# --- Colorize Buffer ---
+# colorize() (thermal_kernels) fills the red/blue columns and returns (min, max)
+rgb = np.zeros((SENSOR_HEIGHT * SENSOR_WIDTH, 3), dtype=np.uint8)
+# (row, col) view of rgb, swapped to the [x][y] order surfarray expects
+rgb_xy = rgb.reshape((SENSOR_HEIGHT, SENSOR_WIDTH, 3)).swapaxes(0, 1)
 # --------------------
 
 # --- MLX90640 Sensor Setup ---
@@ -47,7 +110,8 @@ try:
     # Corrected the typo from MLX9G90640 to MLX90640
     mlx = adafruit_mlx90640.MLX90640(i2c)
     mlx.refresh_rate = adafruit_mlx90640.RefreshRate.REFRESH_4_HZ
-    frame = [0] * (SENSOR_WIDTH * SENSOR_HEIGHT)
+    # getFrame fills any float sequence element-wise, so hand it float32 buffers
+    frame = np.zeros(SENSOR_WIDTH * SENSOR_HEIGHT, dtype=np.float32)  # render copy
     print("MLX90640 sensor initialized. Starting feed...")
 except Exception as e:
     print(f"Error initializing MLX90640: {e}")
@@ -56,7 +120,51 @@ except Exception as e:
     exit()
 # ---------------------------
 
+# --- Sensor Thread ---
+# getFrame blocks for a whole refresh period (~250 ms at 4 Hz), so it runs in
+# the background filling whichever buffer is not currently published; the
+# main loop copies out the latest one and keeps servicing events meanwhile.
+frame_buffers = [np.zeros(SENSOR_WIDTH * SENSOR_HEIGHT, dtype=np.float32) for _ in range(2)]
+frame_lock = threading.Lock()
+frame_ready = threading.Event()
+latest_frame = None
+sensor_error = None  # last I2C failure, cleared by the next good frame
+
+def read_sensor():
+    """Background thread to constantly read thermal frames."""
+    global latest_frame, sensor_error
+    back = 0
+    while True:
+        buf = frame_buffers[back]
+        try:
+            mlx.getFrame(buf)
+        except ValueError:
+            continue # retry into the same buffer
+        except Exception as e:
+            # I2C faults must not kill the thread silently: flag them so the
+            # viewer stops looking live, then keep retrying
+            if sensor_error is None:
+                print(f"Error reading MLX90640: {e}")
+            sensor_error = e
+            time.sleep(0.5)
+            continue
+        with frame_lock:
+            latest_frame = buf
+        sensor_error = None
+        frame_ready.set()
+        back ^= 1
+
+threading.Thread(target=read_sensor, daemon=True).start()
+
+def draw_sensor_error(e):
+    """Banner over the (now stale) image while the sensor is failing."""
+    surf = font.render(f"SENSOR ERROR: {e}"[:48], True, (255, 0, 0), (0, 0, 0))
+    pygame.display.update(screen.blit(surf, (4, 4)))
+# ---------------------------
+
 # --- Main Loop ---
+screen.fill((0, 0, 0))
+showing_error = False
 running = True
 while running:
     # Check for Pygame events (like closing the window)
@@ -66,65 +174,42 @@ while running:
         if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
             running = False
 
-    try:
-        mlx.getFrame(frame)
-    except ValueError:
-        continue # skip this frame
-
-    # --- Clear the entire screen with black before drawing anything
-    screen.fill((0, 0, 0))
-    # ----------------------
-
-    # --- Draw the thermal image (as background) ---
-    temp_min_frame = np.min(frame)
-    temp_max_frame = np.max(frame)
-
-    # Lock the surface ONE time
-    thermal_surface.lock()
-    for y in range(SENSOR_HEIGHT):
-        for x in range(SENSOR_WIDTH):
-            temp = frame[y * SENSOR_WIDTH + x]
-            # Normalize temp for color mapping
-            norm = (temp - temp_min_frame) / (temp_max_frame - temp_min_frame + 0.001)
-            norm = max(0.0, min(1.0, norm))
-            red = int(255 * norm)
-            green = 0
-            blue = int(255 * (1 - norm))
-            thermal_surface.set_at((x, y), (red, green, blue))
-    
-    # Unlock the surface ONE time, after ALL loops are done
-    thermal_surface.unlock() # <-- MOVED THIS LINE OUTSIDE THE 'for y' LOOP
-
+    if sensor_error is not None and not showing_error:
+        draw_sensor_error(sensor_error)
+        showing_error = True
+
+    # Redraw only once the sensor thread has a new frame; the short timeout
+    # keeps the event loop responsive in between
+    if not frame_ready.wait(0.05):
+        continue
+    frame_ready.clear()
+    if showing_error:
+        # Sensor is back; the banner covered cells that may not change
+        showing_error = False
+        prev_key[:] = -1
+    with frame_lock:
+        np.copyto(frame, latest_frame)
+
+    # --- Color the thermal image (as background) ---
+    temp_min_frame, temp_max_frame = colorize(frame, rgb)
+
+    # --- Find the cells whose label, text color or background changed ---
+    # --- Dynamic Text Color ---
+    norm = (frame - temp_min_frame) / (temp_max_frame - temp_min_frame + 0.001)
+    black = norm > 0.6
+    labels = np.rint(frame).astype(np.int64)
+    key = (labels << 17) | (black.astype(np.int64) << 16) | (rgb[:, 0].astype(np.int64) << 8) | rgb[:, 2]
+    changed = np.flatnonzero(key != prev_key).tolist()
+    prev_key = key
+    if not changed:
+        continue
+
+    pygame.surfarray.blit_array(thermal_surface, rgb_xy)
     # Scale the 32x24 surface up to our big 640x480 screen
-    scaled_surface = pygame.transform.scale(thermal_surface, (SCREEN_WIDTH, SCREEN_HEIGHT))
-    # Draw the scaled image to the screen
-    screen.blit(scaled_surface, (0, 0))
-
-    # --- Draw the text overlay ---
-    for y in range(SENSOR_HEIGHT):
-        for x in range(SENSOR_WIDTH):
-            temp = frame[y * SENSOR_WIDTH + x]
-            
-            # --- Dynamic Text Color ---
-            norm = (temp - temp_min_frame) / (temp_max_frame - temp_min_frame + 0.001)
-            text_color = TEXT_BLACK if norm > 0.6 else TEXT_WHITE
-            
-            # Create the text string (rounded to integer)
-            text_str = f"{temp:0.0f}"
-            
-            # Render the text
-            text_surf = font.render(text_str, True, text_color)
-            
-            # Get the text rectangle and center it in the 20x20 box
-            text_rect = text_surf.get_rect()
-            text_rect.center = (x * SCALE_FACTOR + (SCALE_FACTOR // 2), 
-                                y * SCALE_FACTOR + (SCALE_FACTOR // 2))
-            
-            # Draw the text onto the screen
-            screen.blit(text_surf, text_rect)
-
-    # Update the full display
-    pygame.display.flip()
+    pygame.transform.scale(thermal_surface, (SCREEN_WIDTH, SCREEN_HEIGHT), scaled_surface)
+
+    # --- Repaint and update only the changed cells ---
+    draw_dirty_cells(changed, labels.tolist(), black.tolist())
 
 # --- End of Loop ---
 pygame.font.quit()
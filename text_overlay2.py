@@ -4,8 +4,11 @@ import busio
 import adafruit_mlx90640
 import numpy as np
 import pygame
+import threading
 import os
 
+from thermal_kernels import minmax
+
 # --- Pygame Setup ---
 pygame.init()
 pygame.font.init()
@@ -16,6 +19,13 @@ SCALE_FACTOR = 20
 SCREEN_WIDTH = SENSOR_WIDTH * SCALE_FACTOR
 SCREEN_HEIGHT = SENSOR_HEIGHT * SCALE_FACTOR
 
+# Center of each 20x20 cell on screen, in frame (row-major) order
+CELL_CENTERS = [(x * SCALE_FACTOR + (SCALE_FACTOR // 2), y * SCALE_FACTOR + (SCALE_FACTOR // 2))
+                for y in range(SENSOR_HEIGHT) for x in range(SENSOR_WIDTH)]
+# Screen rect of each cell, same order
+CELL_RECTS = [pygame.Rect(x * SCALE_FACTOR, y * SCALE_FACTOR, SCALE_FACTOR, SCALE_FACTOR)
+              for y in range(SENSOR_HEIGHT) for x in range(SENSOR_WIDTH)]
+
 # --- Font and Text Setup ---
 try:
     FONT_SIZE = 18
@@ -40,12 +50,66 @@ except pygame.error as e:
     print(f"Error initializing pygame display: {e}")
     exit()
 
+# The 32x24 heatmap is colored at sensor resolution, then scaled up in one go.
+# pixels3d needs a 24/32-bit surface, so thermal_surface stays explicitly
+# 32-bit rather than taking the display's format (often 16-bit on Pi
+# screens); scale() into a dest needs matching formats, so scaled_surface
+# matches it and the single blit to the screen does the conversion.
+thermal_surface = pygame.Surface((SENSOR_WIDTH, SENSOR_HEIGHT), depth=32)
+scaled_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), depth=32)
+
+# Pre-rendered labels for every whole degree we expect to see, in both colors;
+# anything outside the range is rendered once on first use and kept.
+# convert_alpha() (needs the display, hence down here) puts them in the
+# screen's pixel format so blits skip a per-call format conversion.
+def render_glyph(t, color):
+    return font.render(f"{t}", True, color).convert_alpha()
+
+GLYPHS = {color: {t: render_glyph(t, color) for t in range(-20, 151)}
+          for color in (TEXT_WHITE, TEXT_BLACK)}
+
+def get_glyph(temp, color):
+    t = int(round(float(temp)))
+    glyph = GLYPHS[color].get(t)
+    if glyph is None:
+        glyph = GLYPHS[color][t] = render_glyph(t, color)
+    return glyph
+
+# --- Dirty-cell redraw ---
+# Only cells whose label or color changed since the last frame are repainted,
+# together with their row neighbours: a label can spill into those, so its
+# old overflow has to be erased and its new one drawn there. Each repainted
+# cell gets its background from scaled_surface, then every label touching it,
+# clipped to the cell and in full-redraw order.
+N_CELLS = SENSOR_WIDTH * SENSOR_HEIGHT
+prev_key = np.full(N_CELLS, -1, dtype=np.int64)
+
+def row_neighbours(i):
+    return [j for j in (i - 1, i, i + 1)
+            if 0 <= j < N_CELLS and j // SENSOR_WIDTH == i // SENSOR_WIDTH]
+
+def draw_dirty_cells(changed, labels, black):
+    dirty = sorted({j for i in changed for j in row_neighbours(i)})
+    dirty_set = set(dirty)
+    blit_list = [(scaled_surface, CELL_RECTS[i], CELL_RECTS[i]) for i in dirty]
+    for j in sorted({k for i in dirty for k in row_neighbours(i)}):
+        glyph = get_glyph(labels[j], TEXT_BLACK if black[j] else TEXT_WHITE)
+        g = glyph.get_rect(center=CELL_CENTERS[j])
+        for i in row_neighbours(j):
+            if i in dirty_set:
+                c = g.clip(CELL_RECTS[i])
+                if c:
+                    blit_list.append((glyph, c, c.move(-g.x, -g.y)))
+    screen.blits(blit_list, doreturn=False)
+    pygame.display.update([CELL_RECTS[i] for i in dirty])
+
 # --- MLX90640 Sensor Setup ---
 try:
     i2c = busio.I2C(board.SCL, board.SDA, frequency=800000)
     mlx = adafruit_mlx90640.MLX90640(i2c)
     mlx.refresh_rate = adafruit_mlx90640.RefreshRate.REFRESH_4_HZ
-    frame = [0] * (SENSOR_WIDTH * SENSOR_HEIGHT)
+    # getFrame fills any float sequence element-wise, so hand it float32 buffers
+    frame = np.zeros(SENSOR_WIDTH * SENSOR_HEIGHT, dtype=np.float32)  # render copy
     print("MLX90640 sensor initialized. Starting feed...")
 except Exception as e:
     print(f"Error initializing MLX90640: {e}")
@@ -54,34 +118,73 @@ except Exception as e:
     exit()
 # ---------------------------
 
+# --- Sensor Thread ---
+# getFrame blocks for a whole refresh period (~250 ms at 4 Hz), so it runs in
+# the background filling whichever buffer is not currently published; the
+# main loop copies out the latest one and keeps servicing events meanwhile.
+frame_buffers = [np.zeros(SENSOR_WIDTH * SENSOR_HEIGHT, dtype=np.float32) for _ in range(2)]
+frame_lock = threading.Lock()
+frame_ready = threading.Event()
+latest_frame = None
+sensor_error = None  # last I2C failure, cleared by the next good frame
+
+def read_sensor():
+    """Background thread to constantly read thermal frames."""
+    global latest_frame, sensor_error
+    back = 0
+    while True:
+        buf = frame_buffers[back]
+        try:
+            mlx.getFrame(buf)
+        except ValueError:
+            continue # retry into the same buffer
+        except Exception as e:
+            # I2C faults must not kill the thread silently: flag them so the
+            # viewer stops looking live, then keep retrying
+            if sensor_error is None:
+                print(f"Error reading MLX90640: {e}")
+            sensor_error = e
+            time.sleep(0.5)
+            continue
+        with frame_lock:
+            latest_frame = buf
+        sensor_error = None
+        frame_ready.set()
+        back ^= 1
+
+threading.Thread(target=read_sensor, daemon=True).start()
+
+def draw_sensor_error(e):
+    """Banner over the (now stale) image while the sensor is failing."""
+    surf = font.render(f"SENSOR ERROR: {e}"[:48], True, (255, 0, 0), (0, 0, 0))
+    pygame.display.update(screen.blit(surf, (4, 4)))
+# ---------------------------
+
 # --- CHANGE 2: Better "Heatmap" Color Function ---
-def get_heatmap_color(norm_temp):
-    """Maps a normalized value (0.0 to 1.0) to a BGYR heatmap color."""
+def get_heatmap_colors(norm_temp):
+    """Maps an array of normalized values (0.0 to 1.0) to BGYR heatmap colors.
+
+    Returns a uint8 array with a trailing RGB axis."""
     # Ensure norm_temp is clipped
-    norm_temp = max(0.0, min(1.0, norm_temp))
-    
-    r, g, b = 0, 0, 0
-    
-    if norm_temp < 0.25:
-        # Blue to Green
-        g = int(255 * (norm_temp / 0.25))
-        b = int(255 * (1.0 - (norm_temp / 0.25)))
-    elif norm_temp < 0.5:
-        # Green to Yellow
-        r = int(255 * ((norm_temp - 0.25) / 0.25))
-        g = 255
-    elif norm_temp < 0.75:
-        # Yellow to Red
-        r = 255
-        g = int(255 * (1.0 - ((norm_temp - 0.5) / 0.25)))
-    else:
-        # Red
-        r = 255
-        
-    return (r, g, b)
+    n = np.clip(norm_temp, 0.0, 1.0)
+    blue_green = n < 0.25    # Blue to Green
+    green_yellow = ~blue_green & (n < 0.5)    # Green to Yellow
+    yellow_red = ~blue_green & ~green_yellow & (n < 0.75)    # Yellow to Red, then Red
+
+    r = np.where(blue_green, 0.0, np.where(green_yellow, 255 * ((n - 0.25) / 0.25), 255.0))
+    g = np.where(blue_green, 255 * (n / 0.25),
+                 np.where(green_yellow, 255.0,
+                          np.where(yellow_red, 255 * (1.0 - ((n - 0.5) / 0.25)), 0.0)))
+    b = np.where(blue_green, 255 * (1.0 - (n / 0.25)), 0.0)
+    return np.stack([r, g, b], axis=-1).astype(np.uint8)
+
+# 256-entry lookup table: coloring a frame is then a single gather
+HEATMAP_LUT = get_heatmap_colors(np.arange(256) / 255.0)
 # -----------------------------------------------
 
 # --- Main Loop ---
+screen.fill((0, 0, 0))
+showing_error = False
 running = True
 while running:
     # Check for Pygame events (like closing the window)
@@ -91,54 +194,52 @@ while running:
         if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
             running = False
 
-    try:
-        mlx.getFrame(frame)
-    except ValueError:
-        continue # skip this frame
-
-    # --- Clear the entire screen with black before drawing anything
-    screen.fill((0, 0, 0))
+    if sensor_error is not None and not showing_error:
+        draw_sensor_error(sensor_error)
+        showing_error = True
+
+    # Redraw only once the sensor thread has a new frame; the short timeout
+    # keeps the event loop responsive in between
+    if not frame_ready.wait(0.05):
+        continue
+    frame_ready.clear()
+    if showing_error:
+        # Sensor is back; the banner covered cells that may not change
+        showing_error = False
+        prev_key[:] = -1
+    with frame_lock:
+        np.copyto(frame, latest_frame)
 
     # --- REBUILT THE DRAWING LOOP ---
     
-    temp_min_frame = np.min(frame)
-    temp_max_frame = np.max(frame)
-
-    for y in range(SENSOR_HEIGHT):
-        for x in range(SENSOR_WIDTH):
-            temp = frame[y * SENSOR_WIDTH + x]
-            
-            # --- 1. Calculate Normalized Temp ---
-            norm = (temp - temp_min_frame) / (temp_max_frame - temp_min_frame + 0.001)
-            
-            # --- 2. Get Color and Draw Box ---
-            color = get_heatmap_color(norm)
-            pygame.draw.rect(screen, color, 
-                             (x * SCALE_FACTOR, y * SCALE_FACTOR, 
-                              SCALE_FACTOR, SCALE_FACTOR))
-
-            # --- 3. Draw the Text Overlay ---
-            
-            # --- Dynamic Text Color ---
-            # Use black text on hot colors (yellow/red), white on cool (blue/green)
-            text_color = TEXT_BLACK if norm > 0.5 else TEXT_WHITE
-            
-            # Create the text string (rounded to integer)
-            text_str = f"{temp:0.0f}"
-            
-            # Render the text
-            text_surf = font.render(text_str, True, text_color)
-            
-            # Get the text rectangle and center it in the 20x20 box
-            text_rect = text_surf.get_rect()
-            text_rect.center = (x * SCALE_FACTOR + (SCALE_FACTOR // 2), 
-                                y * SCALE_FACTOR + (SCALE_FACTOR // 2))
-            
-            # Draw the text onto the screen
-            screen.blit(text_surf, text_rect)
-
-    # Update the full display
-    pygame.display.flip()
+    arr = frame.reshape((SENSOR_HEIGHT, SENSOR_WIDTH))
+    temp_min_frame, temp_max_frame = minmax(frame)
+
+    # --- 1. Normalize and color the whole frame at once ---
+    norms = (arr - temp_min_frame) / (temp_max_frame - temp_min_frame + 0.001)
+    idx = (np.clip(norms, 0.0, 1.0) * 255).astype(np.uint8)
+    # Black text on hot colors (yellow/red), i.e. norm > 0.5
+    text_is_black = idx > 127
+
+    # --- 2. Find the cells whose label or color changed ---
+    labels = np.rint(arr).astype(np.int64).ravel()
+    key = labels * 256 + idx.ravel()
+    changed = np.flatnonzero(key != prev_key).tolist()
+    prev_key = key
+    if not changed:
+        continue
+
+    # --- 3. Draw Boxes: one blit + scale instead of a rect per cell ---
+    # The LUT gather writes straight into the surface's pixel memory.
+    # surfarray is indexed [x][y], so the (row, col) indices are transposed.
+    pixels = pygame.surfarray.pixels3d(thermal_surface)
+    np.take(HEATMAP_LUT, idx.T, axis=0, out=pixels, mode='clip')
+    del pixels  # releases the surface lock before it is scaled
+    pygame.transform.scale(thermal_surface, (SCREEN_WIDTH, SCREEN_HEIGHT), scaled_surface)
+
+    # --- 4. Repaint and update only the changed cells ---
+    # Black text on hot colors (yellow/red), white on cool (blue/green)
+    draw_dirty_cells(changed, labels.tolist(), text_is_black.ravel().tolist())
 
 # --- End of Loop ---
 pygame.font.quit()
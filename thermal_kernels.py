@@ -0,0 +1,46 @@
+# thermal_kernels.py
+# Frame kernels shared by the pygame viewers (text_overlay*, visual_test*).
+import numpy as np
+
+# Optional JIT; plain numpy fallbacks are used without it
+try:
+    from numba import njit, prange
+except Exception:
+    njit = None
+
+# Single-pass min/max: one sweep over the frame instead of min() then max()
+if njit:
+    @njit(cache=True, fastmath=True)
+    def minmax(f):
+        mn = mx = f[0]
+        for i in range(1, f.size):
+            v = f[i]
+            if v < mn:
+                mn = v
+            elif v > mx:
+                mx = v
+        return mn, mx
+else:
+    def minmax(f):
+        return f.min(), f.max()
+
+# Fused min/max + normalize + Blue -> Red colormap for a flat frame, writing
+# into a preallocated (N, 3) uint8 buffer whose green column stays 0.
+# Returns the frame's (min, max).
+if njit:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def colorize(f, out):
+        mn, mx = minmax(f)
+        inv = 1.0 / (mx - mn + 0.001)  # +0.001 to avoid div by zero
+        for i in prange(f.size):
+            n = min(max((f[i] - mn) * inv, 0.0), 1.0)
+            out[i, 0] = np.uint8(255 * n)
+            out[i, 2] = np.uint8(255 * (1 - n))
+        return mn, mx
+else:
+    def colorize(f, out):
+        mn, mx = minmax(f)
+        norm = np.clip((f - mn) / (mx - mn + 0.001), 0.0, 1.0)
+        out[:, 0] = 255 * norm
+        out[:, 2] = 255 * (1 - norm)
+        return mn, mx
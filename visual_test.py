@@ -5,6 +5,8 @@ import adafruit_mlx90640
 import numpy as np
 import pygame
 
+from thermal_kernels import colorize
+
 # --- Pygame Setup ---
 pygame.init()
 
@@ -33,6 +35,12 @@ except pygame.error as e:
 
 # This surface will hold the 32x24 thermal image
 thermal_surface = pygame.Surface((SENSOR_WIDTH, SENSOR_HEIGHT))
+
+# --- Colorize Buffer ---
+# colorize() (thermal_kernels) fills the red/blue columns and returns (min, max)
+rgb = np.zeros((SENSOR_HEIGHT * SENSOR_WIDTH, 3), dtype=np.uint8)
+# (row, col) view of rgb, swapped to the [x][y] order surfarray expects
+rgb_xy = rgb.reshape((SENSOR_HEIGHT, SENSOR_WIDTH, 3)).swapaxes(0, 1)
 # --------------------
 
 
@@ -62,7 +70,8 @@ try:
     i2c = busio.I2C(board.SCL, board.SDA, frequency=800000)
     mlx = adafruit_mlx90640.MLX90640(i2c)
     mlx.refresh_rate = adafruit_mlx90640.RefreshRate.REFRESH_4_HZ
-    frame = [0] * (SENSOR_WIDTH * SENSOR_HEIGHT)
+    # getFrame fills any float sequence element-wise, so hand it a float32 buffer
+    frame = np.zeros(SENSOR_WIDTH * SENSOR_HEIGHT, dtype=np.float32)
     print("MLX90640 sensor initialized")
 except Exception as e:
     print(f"Error initializing MLX90640: {e}")
@@ -73,6 +82,9 @@ except Exception as e:
 
 
 # --- Main Loop ---
+# Only every Nth frame's min/max goes to the terminal (~1 Hz at 4 Hz refresh)
+PRINT_EVERY = 4
+frame_count = 0
 running = True
 while running:
     # Check for Pygame events (like closing the window)
@@ -92,28 +104,14 @@ while running:
     # --- Draw the thermal image ---
     # Find the min and max temp in *this* frame for auto-scaling
     # This gives much better contrast than a fixed range.
-    temp_min_frame = np.min(frame)
-    temp_max_frame = np.max(frame)
-    print(f"Frame Temps: Min={temp_min_frame:0.2f}C Max={temp_max_frame:0.2f}C")
-
-    # Lock the surface so we can draw to it
-    thermal_surface.lock()
-    for y in range(SENSOR_HEIGHT):
-        for x in range(SENSOR_WIDTH):
-            temp = frame[y * SENSOR_WIDTH + x]
-            
-            # Normalize temp based on this frame's min/max
-            norm = (temp - temp_min_frame) / (temp_max_frame - temp_min_frame + 0.001) # +0.001 to avoid div by zero
-            norm = max(0.0, min(1.0, norm))
-
-            # Simple Blue -> Red colormap
-            red = int(255 * norm)
-            green = 0
-            blue = int(255 * (1 - norm))
-            
-            # Set the pixel on our small 32x24 surface
-            thermal_surface.set_at((x, y), (red, green, blue))
-    thermal_surface.unlock()
+    # Normalize and color the whole frame based on its own min/max
+    temp_min_frame, temp_max_frame = colorize(frame, rgb)
+    frame_count += 1
+    if frame_count % PRINT_EVERY == 0:
+        print(f"Frame Temps: Min={temp_min_frame:0.2f}C Max={temp_max_frame:0.2f}C")
+
+    # Copy it onto our small 32x24 surface
+    pygame.surfarray.blit_array(thermal_surface, rgb_xy)
 
     # --- Scale and display ---
     # Scale the 32x24 surface up to our big screen size
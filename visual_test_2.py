@@ -6,6 +6,8 @@ import numpy as np
 import pygame
 import os
 
+from thermal_kernels import colorize
+
 # --- Pygame Setup ---
 pygame.init()
 pygame.font.init()
@@ -38,6 +40,12 @@ except pygame.error as e:
     exit()
 
 thermal_surface = pygame.Surface((SENSOR_WIDTH, SENSOR_HEIGHT))
+
+# --- Colorize Buffer ---
+# colorize() (thermal_kernels) fills the red/blue columns and returns (min, max)
+rgb = np.zeros((SENSOR_HEIGHT * SENSOR_WIDTH, 3), dtype=np.uint8)
+# (row, col) view of rgb, swapped to the [x][y] order surfarray expects
+rgb_xy = rgb.reshape((SENSOR_HEIGHT, SENSOR_WIDTH, 3)).swapaxes(0, 1)
 # --------------------
 
 # --- MLX90640 Sensor Setup ---
@@ -45,7 +53,8 @@ try:
     i2c = busio.I2C(board.SCL, board.SDA, frequency=800000)
     mlx = adafruit_mlx90640.MLX90640(i2c)
     mlx.refresh_rate = adafruit_mlx90640.RefreshRate.REFRESH_4_HZ
-    frame = [0] * (SENSOR_WIDTH * SENSOR_HEIGHT)
+    # getFrame fills any float sequence element-wise, so hand it a float32 buffer
+    frame = np.zeros(SENSOR_WIDTH * SENSOR_HEIGHT, dtype=np.float32)
     print("MLX90640 sensor initialized. Starting feed...")
 except Exception as e:
     print(f"Error initializing MLX90640: {e}")
@@ -75,21 +84,8 @@ while running:
     # ----------------------
 
     # --- Draw the thermal image (as background) ---
-    temp_min_frame = np.min(frame)
-    temp_max_frame = np.max(frame)
-
-    thermal_surface.lock()
-    for y in range(SENSOR_HEIGHT):
-        for x in range(SENSOR_WIDTH):
-            temp = frame[y * SENSOR_WIDTH + x]
-            # Normalize temp for color mapping
-            norm = (temp - temp_min_frame) / (temp_max_frame - temp_min_frame + 0.001)
-            norm = max(0.0, min(1.0, norm))
-            red = int(255 * norm)
-            green = 0
-            blue = int(255 * (1 - norm))
-            thermal_surface.set_at((x, y), (red, green, blue))
-    thermal_surface.unlock()
+    temp_min_frame, temp_max_frame = colorize(frame, rgb)
+    pygame.surfarray.blit_array(thermal_surface, rgb_xy)
 
     # Scale the 32x24 surface up to our big 640x480 screen
     scaled_surface = pygame.transform.scale(thermal_surface, (SCREEN_WIDTH, SCREEN_HEIGHT))
@@ -1,13 +1,63 @@
 # web_dashboard.py
 import dash
-from dash import dcc, html
+from dash import dcc, html, Patch
 from dash.dependencies import Input, Output
 import plotly.graph_objs as go
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+
+# Optional msgpack decoding of /api/get_data; falls back to JSON
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 # ---- App Configuration ----
 DASHBOARD_REFRESH_INTERVAL_MS = 1000  # 1 second
 SERVER_DATA_URL = "http://127.0.0.1:5000/api/get_data"
+# Thermal frames come as raw uint8 bytes instead of a JSON array, quantized
+# by the server over THERMAL_QMIN..THERMAL_QMAX (the heatmap's zmin..zmax)
+SERVER_THERMAL_URL = "http://127.0.0.1:5000/api/get_thermal"
+THERMAL_SHAPE = (24, 32)
+THERMAL_QMIN, THERMAL_QMAX = 20.0, 60.0
+THERMAL_STEP = (THERMAL_QMAX - THERMAL_QMIN) / 255
+
+# One keep-alive connection to the data server, reused by every tick
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+if msgpack:
+    SESSION.headers["Accept"] = "application/msgpack, application/json;q=0.9"
+
+# ---- Figure Skeletons ----
+# Built once into the layout; each tick only patches the data that changes
+AWAITING_THERMAL = dict(text="Awaiting thermal data...", showarrow=False)
+
+def make_bar_fig():
+    bar_fig = go.Figure(data=[
+        go.Bar(name='Temperature (°C)', x=['Sensor 1', 'Sensor 2'], y=[0, 0], marker_color='crimson'),
+        go.Bar(name='Humidity (%)', x=['Sensor 1', 'Sensor 2'], y=[0, 0], marker_color='royalblue')
+    ])
+    bar_fig.update_layout(title="Ambient Sensor Readings", plot_bgcolor='white')
+    return bar_fig
+
+def make_heatmap_fig():
+    heatmap_fig = go.Figure(data=go.Heatmap(
+        z=[],
+        colorscale='inferno',
+        zmin=THERMAL_QMIN,  # Set a reasonable min temp for server rooms
+        zmax=THERMAL_QMAX   # Set a reasonable max temp to highlight hotspots
+    ))
+    # Starts as the placeholder until the first frame arrives
+    heatmap_fig.update_layout(
+        title='Live Thermal Camera Feed',
+        xaxis_title='X Axis',
+        yaxis_title='Y Axis',
+        annotations=[AWAITING_THERMAL],
+        xaxis={'visible': False},
+        yaxis={'visible': False}
+    )
+    return heatmap_fig
 
 # ---- Dash App Setup ----
 app = dash.Dash(__name__)
@@ -24,9 +74,9 @@ app.layout = html.Div(
                 html.Div(id="sensor2-display", style={"fontSize": "24px", "fontWeight": "bold"}),
             ]
         ),
-        dcc.Graph(id="live-bar-chart"),
+        dcc.Graph(id="live-bar-chart", figure=make_bar_fig()),
         html.Hr(),
-        dcc.Graph(id="thermal-heatmap", style={"height": "60vh"}),
+        dcc.Graph(id="thermal-heatmap", figure=make_heatmap_fig(), style={"height": "60vh"}),
         dcc.Interval(
             id="interval-component",
             interval=DASHBOARD_REFRESH_INTERVAL_MS,
@@ -43,50 +93,44 @@ app.layout = html.Div(
     Input("interval-component", "n_intervals")
 )
 def update_dashboard(n):
-    # Fetch all data from the Flask server
+    # Fetch all data from the Flask server; each request fails on its own,
+    # so a camera hiccup does not blank the DHT readings or vice versa
     try:
-        response = requests.get(SERVER_DATA_URL, timeout=0.5)
-        data = response.json()
+        response = SESSION.get(SERVER_DATA_URL, timeout=0.5)
+        if response.headers.get("Content-Type", "").startswith("application/msgpack"):
+            data = msgpack.unpackb(response.content, raw=False)
+        else:
+            data = response.json()
         t1, h1, t2, h2 = data.get("t1"), data.get("h1"), data.get("t2"), data.get("h2")
-        thermal_image = data.get("thermal_image")
     except (requests.exceptions.RequestException, ValueError):
-        t1, h1, t2, h2, thermal_image = None, None, None, None, None
+        t1, h1, t2, h2 = None, None, None, None
+
+    thermal_image = None
+    try:
+        response = SESSION.get(SERVER_THERMAL_URL, timeout=0.5)
+        if response.status_code == 200:
+            q = np.frombuffer(response.content, dtype=np.uint8).reshape(THERMAL_SHAPE)
+            thermal_image = q.astype(np.float32) * THERMAL_STEP + THERMAL_QMIN
+    except (requests.exceptions.RequestException, ValueError):
+        pass
 
     # --- Create Text Displays ---
     s1_text = f"Sensor 1: {t1:.1f}°C | {h1:.1f}%" if t1 is not None else "Sensor 1: Awaiting data..."
     s2_text = f"Sensor 2: {t2:.1f}°C | {h2:.1f}%" if t2 is not None else "Sensor 2: Awaiting data..."
 
-    # --- Create Bar Chart Figure ---
-    temps = [t1 or 0, t2 or 0]
-    hums = [h1 or 0, h2 or 0]
-    bar_fig = go.Figure(data=[
-        go.Bar(name='Temperature (°C)', x=['Sensor 1', 'Sensor 2'], y=temps, marker_color='crimson'),
-        go.Bar(name='Humidity (%)', x=['Sensor 1', 'Sensor 2'], y=hums, marker_color='royalblue')
-    ])
-    bar_fig.update_layout(title="Ambient Sensor Readings", plot_bgcolor='white')
+    # --- Patch Bar Chart Figure ---
+    bar_fig = Patch()
+    bar_fig['data'][0]['y'] = [t1 or 0, t2 or 0]
+    bar_fig['data'][1]['y'] = [h1 or 0, h2 or 0]
 
-    # --- Create Thermal Heatmap Figure ---
-    if thermal_image:
-        heatmap_fig = go.Figure(data=go.Heatmap(
-            z=thermal_image,
-            colorscale='inferno',
-            zmin=20,  # Set a reasonable min temp for server rooms
-            zmax=60   # Set a reasonable max temp to highlight hotspots
-        ))
-        heatmap_fig.update_layout(
-            title='Live Thermal Camera Feed',
-            xaxis_title='X Axis',
-            yaxis_title='Y Axis',
-        )
-    else:
-        # Create a placeholder if no data is available
-        heatmap_fig = go.Figure()
-        heatmap_fig.update_layout(
-            title='Live Thermal Camera Feed',
-            annotations=[dict(text="Awaiting thermal data...", showarrow=False)],
-            xaxis={'visible': False},
-            yaxis={'visible': False}
-        )
+    # --- Patch Thermal Heatmap Figure ---
+    # Show the placeholder if no data is available
+    has_image = thermal_image is not None
+    heatmap_fig = Patch()
+    heatmap_fig['data'][0]['z'] = thermal_image if has_image else []
+    heatmap_fig['layout']['annotations'] = [] if has_image else [AWAITING_THERMAL]
+    heatmap_fig['layout']['xaxis']['visible'] = has_image
+    heatmap_fig['layout']['yaxis']['visible'] = has_image
 
     return s1_text, s2_text, bar_fig, heatmap_fig
 
@@ -3,14 +3,13 @@ from dash import dcc, html
 from dash.dependencies import Input, Output
 import plotly.graph_objs as go
 import serial
-import re
+import math
 import threading
 import time
 
 # ---- SERIAL SETUP ----
 COM_PORT = '/dev/ttyUSB0'  # adjust this to your actual port (check with `ls /dev/tty*`)
 BAUD_RATE = 9600
-pattern = re.compile(r'S1,([0-9.]+),([0-9.]+);S2,([0-9.]+),([0-9.]+)')
 
 try:
     ser = serial.Serial(COM_PORT, BAUD_RATE, timeout=1)
@@ -28,9 +27,17 @@ def read_serial():
     while ser:
         try:
             line = ser.readline().decode('utf-8').strip()
-            m = pattern.match(line)
-            if m:
-                t1, h1, t2, h2 = map(float, m.groups())
+            # Fixed "S1,t,h;S2,t,h" format, so plain splits instead of a regex;
+            # malformed lines raise ValueError and are skipped below, and
+            # failed DHT reads ("nan") are skipped like a malformed line
+            if line.startswith('S1,'):
+                s1, s2 = line.split(';', 1)
+                if not s2.startswith('S2,'):
+                    continue
+                t1, h1 = map(float, s1[3:].split(','))
+                t2, h2 = map(float, s2[3:].split(','))
+                if not all(map(math.isfinite, (t1, h1, t2, h2))):
+                    continue
                 with data_lock:
                     latest_data.update({"t1": t1, "h1": h1, "t2": t2, "h2": h2})
         except Exception: